@@ -0,0 +1,34 @@
+"""add session expiry and creator indexes
+
+Revision ID: 20241201_02
+Revises: 20241201_01
+Create Date: 2025-12-01 21:30:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op  # type: ignore[attr-defined]
+
+# revision identifiers, used by Alembic.
+revision = "20241201_02"
+down_revision = "20241201_01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves the periodic expired-session cleanup scan.
+    op.create_index(
+        op.f("ix_sessions_expires_at_active"),
+        "sessions",
+        ["expires_at", "is_active"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_sessions_creator_id"), "sessions", ["creator_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_sessions_creator_id"), table_name="sessions")
+    op.drop_index(op.f("ix_sessions_expires_at_active"), table_name="sessions")
@@ -3,21 +3,19 @@
 from __future__ import annotations
 
 from collections.abc import AsyncGenerator
+from functools import lru_cache
 
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import Settings, settings
-from app.db.session import AsyncSessionFactory, get_session
+from app.db.session import get_session
 
-
-async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
-    """Yield a database session for request handling."""
-
-    async with AsyncSessionFactory() as session:
-        yield session
+# Request handlers share the single session dependency from ``app.db.session``.
+get_db_session = get_session
 
 
+@lru_cache
 def get_settings() -> Settings:
     """Provide application settings for injection."""
 
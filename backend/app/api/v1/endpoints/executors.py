@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
+
 from fastapi import APIRouter
 
 from app.schemas.execution import ExecutorList, Executor
@@ -9,23 +11,22 @@ from app.services.executor.registry import ExecutorRegistry
 
 router = APIRouter()
 
+_DISPLAY_NAMES = {
+    "python3.13": "Python 3.13",
+    "javascript": "JavaScript (Node.js)",
+    "sql-postgres": "SQL (PostgreSQL)",
+    "sql-mysql": "SQL (MySQL)",
+    "sql-sqlite": "SQL (SQLite)",
+}
 
-@router.get("", response_model=ExecutorList)
-async def list_executors() -> ExecutorList:
-    """Get list of supported code executors."""
-    languages = ExecutorRegistry.list_supported_languages()
-    executors = []
 
-    for lang in languages:
-        # Create display names for languages
-        display_name = {
-            "python3.13": "Python 3.13",
-            "javascript": "JavaScript (Node.js)",
-            "sql-postgres": "SQL (PostgreSQL)",
-            "sql-mysql": "SQL (MySQL)",
-            "sql-sqlite": "SQL (SQLite)",
-        }.get(lang, lang.title())
+@lru_cache(maxsize=1)
+def build_executor_list() -> ExecutorList:
+    """Build the executor listing once; the registry is populated at import."""
+    executors = []
 
+    for lang in ExecutorRegistry.list_supported_languages():
+        display_name = _DISPLAY_NAMES.get(lang, lang.title())
         executors.append(
             Executor(
                 language=lang,
@@ -35,3 +36,9 @@ async def list_executors() -> ExecutorList:
         )
 
     return ExecutorList(executors=executors)
+
+
+@router.get("", response_model=ExecutorList)
+async def list_executors() -> ExecutorList:
+    """Get list of supported code executors."""
+    return build_executor_list()
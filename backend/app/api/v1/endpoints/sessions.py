@@ -2,16 +2,18 @@
 
 from __future__ import annotations
 
+from datetime import UTC, datetime
 from uuid import UUID
 
 from fastapi import APIRouter
-from fastapi import Depends, HTTPException, Response, status
+from fastapi import BackgroundTasks, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db_session
 from app.schemas.execution import ExecutionCreate, ExecutionResultRead
-from app.schemas.problem import ProblemUpdate, ProblemRead, ProblemBroadcast
+from app.schemas.problem import ProblemUpdate, ProblemRead
 from app.schemas.session import (
+    SESSION_LIST_ADAPTER,
     SessionCreate,
     SessionDetail,
     SessionJoinRequest,
@@ -26,6 +28,7 @@ from app.services.session_service import (
     SessionNotFoundError,
     UserNotFoundError,
     create_session,
+    get_problem_text,
     get_session_by_id,
     join_session,
     list_sessions,
@@ -42,7 +45,6 @@ async def create_session_endpoint(
     payload: SessionCreate, db: AsyncSession = Depends(get_db_session)
 ) -> SessionDetail:
     session_obj = await create_session(db, payload)
-    await db.refresh(session_obj, attribute_names=["users"])
     return SessionDetail.model_validate(session_obj)
 
 
@@ -62,7 +64,9 @@ async def list_sessions_endpoint(
     db: AsyncSession = Depends(get_db_session),
 ) -> SessionList:
     sessions = await list_sessions(db)
-    return SessionList(items=[SessionDetail.model_validate(obj) for obj in sessions])
+    return SessionList(
+        items=SESSION_LIST_ADAPTER.validate_python(sessions, from_attributes=True)
+    )
 
 
 @router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -79,6 +83,7 @@ async def delete_session_endpoint(
 async def update_problem_endpoint(
     session_id: UUID,
     payload: ProblemUpdate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db_session),
 ) -> SessionDetail:
     try:
@@ -93,12 +98,18 @@ async def update_problem_endpoint(
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)
         ) from exc
-    await db.refresh(session_obj, attribute_names=["users"])
-    session_detail = SessionDetail.model_validate(session_obj)
-    await broadcast_problem_update(
-        ProblemBroadcast.from_session(session_detail, payload.user_id)
+    # Fan out after the response is sent so Redis latency stays off the request.
+    background_tasks.add_task(
+        broadcast_problem_update,
+        session_obj.id,
+        {
+            "session_id": str(session_obj.id),
+            "updated_by": str(payload.user_id),
+            "problem_text": session_obj.problem_text or "",
+            "timestamp": datetime.now(UTC).isoformat(),
+        },
     )
-    return session_detail
+    return SessionDetail.model_validate(session_obj)
 
 
 @router.get("/{session_id}/problem", response_model=ProblemRead)
@@ -106,10 +117,10 @@ async def get_problem_endpoint(
     session_id: UUID, db: AsyncSession = Depends(get_db_session)
 ) -> ProblemRead:
     try:
-        session_obj = await get_session_by_id(db, session_id)
+        problem_text = await get_problem_text(db, session_id)
     except SessionNotFoundError as exc:  # pragma: no cover
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND) from exc
-    return ProblemRead(problem_text=session_obj.problem_text)
+    return ProblemRead(problem_text=problem_text)
 
 
 @router.post(
@@ -127,15 +138,11 @@ async def join_session_endpoint(
         user, created = await join_session(
             db, session_id, user_id=payload.user_id if payload else None
         )
-    except SessionNotFoundError as exc:  # pragma: no cover - fastapi handles
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND) from exc
-    except UserNotFoundError as exc:  # pragma: no cover - fastapi handles
+    except (SessionNotFoundError, UserNotFoundError) as exc:  # pragma: no cover
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND) from exc
 
     if created:
         response.status_code = status.HTTP_201_CREATED
-    else:
-        response.status_code = status.HTTP_200_OK
     return UserRead.model_validate(user)
 
 
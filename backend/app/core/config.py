@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import os
-from typing import List
+from typing import List, Literal
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -21,11 +21,25 @@ class Settings(BaseSettings):
     )
     TEST_DATABASE_URL: str | None = None
     DATABASE_POOL_SIZE: int = 20
+    DATABASE_MAX_OVERFLOW: int = 40
+    DATABASE_POOL_TIMEOUT: int = 30
+    DATABASE_POOL_RECYCLE_SECONDS: int = 1800
     SQLALCHEMY_ECHO: bool = False
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_PUBSUB_CHANNEL: str = "sharedb"
+    REDIS_MAX_CONNECTIONS: int = 64
+
+    # Collaborative editing
+    SHAREDB_SNAPSHOT_INTERVAL: int = 50
+    SHAREDB_HISTORY_LIMIT: int = 1000
+    SHAREDB_HISTORY_PAGE_SIZE: int = 500
+    SHAREDB_MAX_BATCH_OPERATIONS: int = 500
+    SHAREDB_CACHE_MAX_DOCUMENTS: int = 10_000
+    SHAREDB_CACHE_TTL_SECONDS: int = 3600
+    SHAREDB_CURSOR_FLUSH_MS: int = 30
+    WEBSOCKET_SEND_QUEUE_SIZE: int = 1000
 
     # Testing flag
     TESTING: bool = Field(
@@ -43,6 +57,9 @@ class Settings(BaseSettings):
     DOCKER_HOST: str = "unix:///var/run/docker.sock"
     EXECUTION_TIMEOUT: int = 10
     EXECUTION_MEMORY_LIMIT: str = "256m"
+    EXECUTION_MAX_CONCURRENCY: int = Field(default_factory=lambda: os.cpu_count() or 4)
+    EXECUTION_VALIDATION_CACHE_SIZE: int = 1024
+    EXECUTION_WARM_INTERPRETERS: int = 2
     PYTHON_EXECUTOR_IMAGE: str = "rivendell/python:3.13-executor"
     SUPPORTED_LANGUAGES: List[str] = Field(default_factory=lambda: ["python3.13"])
     PROBLEM_TEXT_MAX_LENGTH: int | None = 20000
@@ -68,3 +85,5 @@ class Settings(BaseSettings):
 
 
 settings = Settings()
+# Closed set of language ids, checked by pydantic-core without a Python validator.
+SupportedLanguage = Literal[tuple(settings.SUPPORTED_LANGUAGES)]  # type: ignore[valid-type]
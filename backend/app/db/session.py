@@ -16,7 +16,18 @@ from app.core.config import settings
 
 def _build_engine(database_url: str | None = None) -> AsyncEngine:
     url = database_url or settings.DATABASE_URL
-    return create_async_engine(url, echo=settings.SQLALCHEMY_ECHO)
+    if url.startswith("sqlite"):
+        # SQLite uses a single-connection pool that rejects sizing arguments.
+        return create_async_engine(url, echo=settings.SQLALCHEMY_ECHO)
+    return create_async_engine(
+        url,
+        echo=settings.SQLALCHEMY_ECHO,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=True,
+    )
 
 
 engine: AsyncEngine = _build_engine()
@@ -3,18 +3,20 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 from contextlib import asynccontextmanager, suppress
+from types import MappingProxyType
 from typing import Awaitable
 from uuid import UUID
 
+import orjson
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.api import api_router
 from app.core.config import settings
 from app.db.session import AsyncSessionFactory
+from app.services.executor.python_executor import Python313Executor
 from app.services.redis_service import close_redis_client, get_redis_client
 from app.services.session_service import cleanup_expired_sessions
 from app.websocket.connection_manager import connection_manager
@@ -22,6 +24,11 @@ from app.websocket.sharedb_integration import ShareDBHandler
 
 logger = logging.getLogger(__name__)
 
+_EMPTY_MAPPING: MappingProxyType = MappingProxyType({})
+_SHAREDB_MESSAGE_TYPES = frozenset(
+    {"fetch", "subscribe", "unsubscribe", "op", "op-batch", "history"}
+)
+
 
 async def _session_cleanup_loop() -> None:
     interval = max(1, settings.SESSION_CLEANUP_INTERVAL_SECONDS)
@@ -43,25 +50,28 @@ async def _redis_listener_loop() -> None:
             redis = await get_redis_client()
             pubsub = redis.pubsub(ignore_subscribe_messages=True)
             await pubsub.subscribe(settings.REDIS_PUBSUB_CHANNEL)
+            origin_id = connection_manager.origin_id
             async for message in pubsub.listen():
-                if message.get("type") != "message":
+                if message["type"] != "message":
                     continue
-                raw = message.get("data")
+                raw = message["data"]
                 if not raw:
                     continue
                 try:
-                    payload = json.loads(raw)
-                except json.JSONDecodeError:
+                    payload = orjson.loads(raw)
+                except orjson.JSONDecodeError:
                     logger.debug("Ignored malformed pubsub payload: %s", raw)
                     continue
-                meta = payload.get("meta", {})
-                if meta.get("origin") == connection_manager.origin_id:
+                if (
+                    not isinstance(payload, dict)
+                    or payload.get("type") != "problem_updated"
+                ):
                     continue
-
-                event_type = payload.get("type")
-                if event_type != "problem_updated":
+                meta = payload.get("meta") or _EMPTY_MAPPING
+                if meta.get("origin") == origin_id:
                     continue
-                data = payload.get("data", {})
+
+                data = payload.get("data") or _EMPTY_MAPPING
                 session_id_value = data.get("session_id")
                 if session_id_value is None:
                     continue
@@ -108,6 +118,7 @@ async def lifespan(
         task.cancel()
         with suppress(asyncio.CancelledError):
             await task
+    await Python313Executor.close_pool()
     await close_redis_client()
 
 
@@ -136,6 +147,8 @@ async def session_websocket(websocket: WebSocket, session_id: str) -> None:
     except ValueError:
         await websocket.close(code=1003)
         return
+    # Canonical string form, formatted once for the lifetime of the connection.
+    session_id = str(session_uuid)
 
     # Connect with generated connection_id
     connection_id = await connection_manager.connect(session_uuid, websocket)
@@ -148,39 +161,26 @@ async def session_websocket(websocket: WebSocket, session_id: str) -> None:
     try:
         while True:
             data = await websocket.receive_text()
-
-            # Check if this is a ShareDB message
-            if data.startswith("{"):
-                try:
-                    import json
-
-                    message = json.loads(data)
-                    msg_type = message.get("type")
-
-                    # Handle ShareDB messages
-                    if msg_type in [
-                        "fetch",
-                        "subscribe",
-                        "unsubscribe",
-                        "op",
-                        "history",
-                    ]:
-                        response = await ShareDBHandler.handle_sharedb_message(
-                            data, connection_id, str(session_uuid), user_id
-                        )
-                        if response:
-                            await websocket.send_json(response)
-                        continue
-                except (json.JSONDecodeError, ValueError):
-                    pass
-
-            # Handle regular messages as before
             try:
-                message = json.loads(data)
-            except json.JSONDecodeError:
+                message = orjson.loads(data)
+            except orjson.JSONDecodeError:
+                continue
+            if not isinstance(message, dict):
+                continue
+
+            if message.get("type") in _SHAREDB_MESSAGE_TYPES:
+                response = await ShareDBHandler.handle_sharedb_message(
+                    message, connection_id, session_id, user_id
+                )
+                if response:
+                    # Replies share the fan-out queue, so an op-ack can never
+                    # overtake a remote-op already queued for this client.
+                    connection_manager.enqueue_text(
+                        connection_id, orjson.dumps(response).decode()
+                    )
                 continue
 
-            message.setdefault("session_id", str(session_uuid))
+            message.setdefault("session_id", session_id)
             await connection_manager.broadcast(session_uuid, message, sender=websocket)
 
     except WebSocketDisconnect:
@@ -6,7 +6,7 @@ import uuid
 from datetime import datetime, timezone
 from enum import Enum
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String, Text
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, String, Text
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import CHAR, TypeDecorator
@@ -28,12 +28,17 @@ class GUID(TypeDecorator):
     def process_bind_param(self, value, dialect):  # type: ignore[override]
         if value is None:
             return value
+        if dialect.name == "postgresql":
+            # Native UUID column: hand uuid.UUID objects straight to the driver.
+            if isinstance(value, uuid.UUID):
+                return value
+            return uuid.UUID(str(value))
         if isinstance(value, uuid.UUID):
             return str(value)
         return str(uuid.UUID(str(value)))
 
     def process_result_value(self, value, dialect):  # type: ignore[override]
-        if value is None:
+        if value is None or isinstance(value, uuid.UUID):
             return value
         return uuid.UUID(str(value))
 
@@ -49,6 +54,9 @@ def _utcnow() -> datetime:
 
 class Session(Base):
     __tablename__ = "sessions"
+    __table_args__ = (
+        Index("ix_sessions_expires_at_active", "expires_at", "is_active"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -61,7 +69,9 @@ class Session(Base):
     language: Mapped[str] = mapped_column(String(64), nullable=False)
     code_snapshot: Mapped[str | None] = mapped_column(Text())
     problem_text: Mapped[str | None] = mapped_column(Text())
-    creator_id: Mapped[uuid.UUID | None] = mapped_column(GUID(), ForeignKey("users.id"))
+    creator_id: Mapped[uuid.UUID | None] = mapped_column(
+        GUID(), ForeignKey("users.id"), index=True
+    )
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
 
     users: Mapped[list[User]] = relationship(
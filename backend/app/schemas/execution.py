@@ -6,25 +6,16 @@ from uuid import UUID
 
 from pydantic import BaseModel, Field, field_validator
 
-from app.core.config import settings
+from app.core.config import SupportedLanguage
 
 
 class ExecutionCreate(BaseModel):
     code: str = Field(..., min_length=1)
-    language: str
+    language: SupportedLanguage  # type: ignore[valid-type]
     stdin: str | None = None
     timeout: int | None = None
     memory_limit: str | None = None
 
-    @field_validator("language")
-    @classmethod
-    def validate_language(cls, value: str) -> str:
-        if value not in settings.SUPPORTED_LANGUAGES:
-            raise ValueError(
-                f"language '{value}' is not supported; options: {settings.SUPPORTED_LANGUAGES}"
-            )
-        return value
-
     @field_validator("timeout")
     @classmethod
     def validate_timeout(cls, value: int | None) -> int | None:
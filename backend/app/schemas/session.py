@@ -6,27 +6,18 @@ from datetime import datetime
 from typing import List
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
-from app.core.config import settings
+from app.core.config import SupportedLanguage
 from app.models.session import UserRole
 
 
 class SessionCreate(BaseModel):
     name: str = Field(..., max_length=255)
-    language: str = Field(..., max_length=64)
+    language: SupportedLanguage  # type: ignore[valid-type]
     creator_id: UUID | None = None
     problem_text: str | None = None
 
-    @field_validator("language")
-    @classmethod
-    def validate_language(cls, value: str) -> str:
-        if value not in settings.SUPPORTED_LANGUAGES:
-            raise ValueError(
-                f"language '{value}' is not supported; options: {settings.SUPPORTED_LANGUAGES}"
-            )
-        return value
-
 
 class SessionRead(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -61,3 +52,9 @@ class SessionDetail(SessionRead):
 
 class SessionJoinRequest(BaseModel):
     user_id: UUID | None = None
+
+
+# Compiled once so list endpoints validate ORM rows in a single pydantic-core call.
+SESSION_LIST_ADAPTER: TypeAdapter[list[SessionDetail]] = TypeAdapter(
+    list[SessionDetail]
+)
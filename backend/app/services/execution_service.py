@@ -2,14 +2,19 @@
 
 from __future__ import annotations
 
+import asyncio
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.schemas.execution import ExecutionCreate
 from app.services.executor.base import ExecutionRequest, ExecutionResult
 from app.services.executor.registry import ExecutorRegistry
-from app.services.session_service import get_session_by_id
+from app.services.session_service import ensure_session_exists
+
+# Caps concurrently running snippets so bursts cannot fork one interpreter per request.
+_EXECUTION_SEMAPHORE = asyncio.Semaphore(max(1, settings.EXECUTION_MAX_CONCURRENCY))
 
 
 class ExecutionValidationError(ValueError):
@@ -19,7 +24,7 @@ class ExecutionValidationError(ValueError):
 async def execute_for_session(
     db: AsyncSession, session_id: UUID, payload: ExecutionCreate
 ) -> ExecutionResult:
-    await get_session_by_id(db, session_id)  # ensures session exists or raises
+    await ensure_session_exists(db, session_id)
 
     executor = ExecutorRegistry.get_executor(payload.language)
 
@@ -34,4 +39,5 @@ async def execute_for_session(
         memory_limit=payload.memory_limit or executor.default_memory,
     )
 
-    return await executor.execute(request)
+    async with _EXECUTION_SEMAPHORE:
+        return await executor.execute(request)
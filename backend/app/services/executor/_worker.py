@@ -0,0 +1,73 @@
+"""Single-use interpreter entry point for the Python executor.
+
+The executor starts this script ahead of time so interpreter startup happens off the
+request path. It blocks until a JSON request arrives on stdin, applies the requested
+resource limits, runs the snippet the way ``python -c`` would, and exits; a process
+never runs more than one snippet. ``argv[1]`` names a pipe fd that receives the peak
+RSS in kilobytes on exit.
+"""
+
+import builtins
+import io
+import json
+import os
+import sys
+import traceback
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - non-POSIX hosts run without limits
+    resource = None  # type: ignore[assignment]
+
+
+def _apply_limits(request: dict) -> None:
+    if resource is None:
+        return
+    limits = (
+        (resource.RLIMIT_AS, request.get("memory_bytes")),
+        (resource.RLIMIT_CPU, request.get("cpu_seconds")),
+        (resource.RLIMIT_FSIZE, 0),
+        (resource.RLIMIT_NOFILE, 64),
+    )
+    for which, value in limits:
+        if value is None:
+            continue
+        _, hard = resource.getrlimit(which)
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        resource.setrlimit(which, (value, value))
+
+
+def _report_peak_rss(report_fd: int) -> None:
+    if resource is None:
+        return
+    # ru_maxrss is reported in kilobytes on Linux.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    os.write(report_fd, str(peak).encode())
+
+
+def main() -> int:
+    report_fd = int(sys.argv[1])
+    raw = sys.stdin.buffer.read()
+    if not raw:
+        # Parent went away before handing over a snippet.
+        return 0
+
+    request = json.loads(raw)
+    sys.argv = ["-c"]
+    sys.stdin = io.StringIO(request.get("stdin") or "")
+    namespace = {"__name__": "__main__", "__builtins__": builtins}
+    _apply_limits(request)
+    try:
+        exec(compile(request["code"], "<string>", "exec"), namespace)  # noqa: S102 - executing user code is this worker's purpose
+    except Exception as exc:  # noqa: BLE001 - mirror the interpreter's top level
+        # Drop this module's frame so the traceback matches ``python -c``.
+        traceback.print_exception(exc.with_traceback(exc.__traceback__.tb_next))
+        return 1
+    finally:
+        _report_peak_rss(report_fd)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,14 +4,211 @@ from __future__ import annotations
 
 import ast
 import asyncio
+import hashlib
+import json
+import math
+import os
 import sys
 import time
+from collections import OrderedDict, deque
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
 from typing import Any
 
 from app.core.config import settings
 
 from .base import BaseExecutor, ExecutionRequest, ExecutionResult
 
+_ALLOWED_MODULES: frozenset[str] = frozenset(
+    map(
+        sys.intern,
+        (
+            "math",
+            "itertools",
+            "collections",
+            "functools",
+            "heapq",
+            "bisect",
+            "re",
+            "json",
+            "datetime",
+            "statistics",
+            "random",
+            "decimal",
+            "fractions",
+            "typing",
+        ),
+    )
+)
+
+
+class _ValidationError(Exception):
+    """Raised by the AST visitor to stop at the first disallowed construct."""
+
+
+class _ImportValidator(ast.NodeVisitor):
+    """Single-pass visitor that only inspects imports and calls."""
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            root = alias.name.partition(".")[0]
+            if root not in _ALLOWED_MODULES:
+                raise _ValidationError(f"import '{alias.name}' is not allowed")
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        if node.module is None:
+            raise _ValidationError("relative imports are not allowed")
+        root = node.module.partition(".")[0]
+        if root not in _ALLOWED_MODULES:
+            raise _ValidationError(f"import '{node.module}' is not allowed")
+
+    def visit_Call(self, node: ast.Call) -> None:
+        if type(node.func) is ast.Name and node.func.id == "__import__":
+            raise _ValidationError("__import__ is not allowed")
+        self.generic_visit(node)
+
+
+_AST_FLAGS = ast.PyCF_ONLY_AST | ast.PyCF_OPTIMIZED_AST
+
+
+# Validation results by source digest, least recently used first. Keying on the
+# digest keeps the cache small no matter how large the submitted programs are.
+_VALIDATION_CACHE: OrderedDict[bytes, tuple[bool, str | None]] = OrderedDict()
+
+
+def _validate_source(code: str) -> tuple[bool, str | None]:
+    """Parse and check a snippet; repeat submissions of the same code hit the cache."""
+    key = hashlib.blake2b(code.encode(), digest_size=16).digest()
+    result = _VALIDATION_CACHE.get(key)
+    if result is not None:
+        _VALIDATION_CACHE.move_to_end(key)
+        return result
+
+    result = _check_source(code)
+    _VALIDATION_CACHE[key] = result
+    if len(_VALIDATION_CACHE) > settings.EXECUTION_VALIDATION_CACHE_SIZE:
+        _VALIDATION_CACHE.popitem(last=False)
+    return result
+
+
+def _check_source(code: str) -> tuple[bool, str | None]:
+    try:
+        # The optimized AST arrives constant-folded, leaving less for the validator.
+        tree = compile(code, "<string>", "exec", flags=_AST_FLAGS)
+    except SyntaxError as exc:  # pragma: no cover - compile reports error context
+        return False, f"syntax error: {exc}"
+
+    try:
+        _ImportValidator().visit(tree)
+    except _ValidationError as exc:
+        return False, str(exc)
+    return True, None
+
+
+_WORKER_SCRIPT = str(Path(__file__).with_name("_worker.py"))
+_MEMORY_UNITS = {"b": 1, "k": 1024, "m": 1024**2, "g": 1024**3}
+
+
+def _parse_memory_limit(value: str) -> int:
+    """Convert a Docker-style memory string such as ``256m`` into bytes."""
+    text = value.strip().lower()
+    multiplier = _MEMORY_UNITS.get(text[-1:], None)
+    number = text[:-1] if multiplier is not None else text
+    if not number.isdigit():
+        raise ValueError(f"invalid memory limit: {value!r}")
+    return int(number) * (multiplier or 1)
+
+
+@dataclass(slots=True)
+class _Worker:
+    process: asyncio.subprocess.Process
+    report_fd: int
+
+    def kill(self) -> None:
+        with suppress(ProcessLookupError):
+            self.process.kill()
+
+    def read_peak_rss_kb(self) -> int:
+        """Read the peak RSS the worker reported on exit, then release the pipe."""
+        try:
+            report = os.read(self.report_fd, 32)
+        except BlockingIOError:
+            report = b""
+        finally:
+            os.close(self.report_fd)
+        return int(report) if report.isdigit() else 0
+
+
+class _WarmInterpreterPool:
+    """Pre-started single-use interpreters that wait for a snippet on stdin.
+
+    Handing a snippet to an already booted process keeps interpreter startup off the
+    request path while every snippet still runs in a fresh process.
+    """
+
+    def __init__(self, python_binary: str, size: int) -> None:
+        self._python_binary = python_binary
+        self._size = size
+        self._idle: deque[_Worker] = deque()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def _spawn(self) -> _Worker:
+        # The worker writes its peak RSS to this pipe as it exits.
+        report_read, report_write = os.pipe()
+        os.set_blocking(report_read, False)
+        try:
+            process = await asyncio.create_subprocess_exec(
+                self._python_binary,
+                "-I",
+                _WORKER_SCRIPT,
+                str(report_write),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                pass_fds=(report_write,),
+            )
+        except BaseException:
+            os.close(report_read)
+            raise
+        finally:
+            os.close(report_write)
+        return _Worker(process, report_read)
+
+    def _discard(self, worker: _Worker) -> None:
+        worker.kill()
+        os.close(worker.report_fd)
+
+    async def acquire(self) -> _Worker:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Subprocess transports are bound to the loop that created them.
+            while self._idle:
+                self._discard(self._idle.popleft())
+            self._loop = loop
+
+        worker = None
+        while self._idle:
+            candidate = self._idle.popleft()
+            if candidate.process.returncode is None:
+                worker = candidate
+                break
+            os.close(candidate.report_fd)
+        if worker is None:
+            worker = await self._spawn()
+
+        # Spawning only forks; the replacement boots while this snippet runs.
+        while len(self._idle) < self._size:
+            self._idle.append(await self._spawn())
+        return worker
+
+    async def close(self) -> None:
+        """Terminate idle interpreters; call from the loop that started them."""
+        while self._idle:
+            worker = self._idle.popleft()
+            self._discard(worker)
+            await worker.process.wait()
+
 
 class Python313Executor(BaseExecutor):
     """Execute Python snippets inside the host interpreter sandbox."""
@@ -21,48 +218,14 @@ class Python313Executor(BaseExecutor):
     default_timeout = settings.EXECUTION_TIMEOUT
     default_memory = settings.EXECUTION_MEMORY_LIMIT
 
-    _ALLOWED_MODULES = {
-        "math",
-        "itertools",
-        "collections",
-        "functools",
-        "heapq",
-        "bisect",
-        "re",
-        "json",
-        "datetime",
-        "statistics",
-        "random",
-        "decimal",
-        "fractions",
-        "typing",
-    }
-
-    def __init__(self) -> None:
-        self._python_binary = sys.executable
+    _pool = _WarmInterpreterPool(sys.executable, settings.EXECUTION_WARM_INTERPRETERS)
+
+    @classmethod
+    async def close_pool(cls) -> None:
+        await cls._pool.close()
 
     async def validate_code(self, code: str) -> tuple[bool, str | None]:
-        try:
-            tree = ast.parse(code)
-        except SyntaxError as exc:  # pragma: no cover - ast.parse reports error context
-            return False, f"syntax error: {exc}"
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    root = alias.name.split(".")[0]
-                    if root not in self._ALLOWED_MODULES:
-                        return False, f"import '{alias.name}' is not allowed"
-            elif isinstance(node, ast.ImportFrom):
-                if node.module is None:
-                    return False, "relative imports are not allowed"
-                root = node.module.split(".")[0]
-                if root not in self._ALLOWED_MODULES:
-                    return False, f"import '{node.module}' is not allowed"
-            elif isinstance(node, ast.Call):
-                if isinstance(node.func, ast.Name) and node.func.id == "__import__":
-                    return False, "__import__ is not allowed"
-        return True, None
+        return _validate_source(code)
 
     def get_resource_limits(self) -> dict[str, Any]:
         return {"timeout": self.default_timeout, "memory_limit": self.default_memory}
@@ -71,31 +234,40 @@ class Python313Executor(BaseExecutor):
         timeout = request.timeout or self.default_timeout
         start = time.perf_counter()
 
-        process = await asyncio.create_subprocess_exec(
-            self._python_binary,
-            "-I",
-            "-c",
-            request.code,
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
+        payload = json.dumps(
+            {
+                "code": request.code,
+                "stdin": request.stdin,
+                # Requests may lower the cap but never raise it past the default.
+                "memory_bytes": min(
+                    _parse_memory_limit(request.memory_limit or self.default_memory),
+                    _parse_memory_limit(self.default_memory),
+                ),
+                # Kernel backstop for CPU-bound loops; wait_for still covers sleeps.
+                "cpu_seconds": math.ceil(timeout) + 1,
+            }
+        ).encode()
+        worker = await self._pool.acquire()
+        process = worker.process
 
         try:
             stdout_bytes, stderr_bytes = await asyncio.wait_for(
-                process.communicate(
-                    input=request.stdin.encode() if request.stdin is not None else None
-                ),
+                process.communicate(input=payload),
                 timeout=timeout,
             )
             exit_code = await process.wait()
             error = None
         except asyncio.TimeoutError:
-            process.kill()
-            await process.wait()
             stdout_bytes, stderr_bytes = b"", b""
             exit_code = -1
             error = "execution timed out"
+        finally:
+            # Single-use worker: reap it however the call exits, including when
+            # the request is cancelled mid-run.
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            memory_used_kb = worker.read_peak_rss_kb()
 
         execution_time_ms = int((time.perf_counter() - start) * 1000)
 
@@ -104,6 +276,6 @@ class Python313Executor(BaseExecutor):
             stderr=stderr_bytes.decode(),
             exit_code=exit_code,
             execution_time_ms=execution_time_ms,
-            memory_used_kb=0,
+            memory_used_kb=memory_used_kb,
             error=error,
         )
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Type
+from typing import ClassVar, Type
 
 from .base import BaseExecutor
 from .python_executor import Python313Executor
@@ -12,18 +12,23 @@ class ExecutorRegistry:
     """Plugin registry for code executors."""
 
     _executors: dict[str, Type[BaseExecutor]] = {}
+    _instances: ClassVar[dict[str, BaseExecutor]] = {}
 
     @classmethod
     def register(cls, executor_class: Type[BaseExecutor]):
         """Register a new executor"""
         cls._executors[executor_class.language] = executor_class
+        cls._instances.pop(executor_class.language, None)
 
     @classmethod
     def get_executor(cls, language: str) -> BaseExecutor:
-        """Get executor instance for language"""
-        if language not in cls._executors:
-            raise ValueError(f"Unsupported language: {language}")
-        return cls._executors[language]()
+        """Get executor instance for language; executors are stateless and shared."""
+        instance = cls._instances.get(language)
+        if instance is None:
+            if language not in cls._executors:
+                raise ValueError(f"Unsupported language: {language}")
+            instance = cls._instances[language] = cls._executors[language]()
+        return instance
 
     @classmethod
     def list_supported_languages(cls) -> list[str]:
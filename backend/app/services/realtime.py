@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-import json
 from typing import Any
+from uuid import UUID
+
+import orjson
 
 from app.core.config import settings
-from app.schemas.problem import ProblemBroadcast
 from app.services.redis_service import get_redis_client
 from app.websocket.connection_manager import connection_manager
 
@@ -15,19 +16,21 @@ _ORIGIN_ID = connection_manager.origin_id
 
 
 async def publish_event(message: dict[str, Any]) -> None:
-    message = dict(message)
-    meta = message.setdefault("meta", {})
-    meta.setdefault("origin", _ORIGIN_ID)
+    """Publish to other workers, stamping ``meta.origin`` on ``message`` in place."""
+    meta = message.setdefault("meta", {"origin": _ORIGIN_ID})
+    if "origin" not in meta:
+        meta["origin"] = _ORIGIN_ID
     redis = await get_redis_client()
-    await redis.publish(settings.REDIS_PUBSUB_CHANNEL, json.dumps(message, default=str))
+    await redis.publish(
+        settings.REDIS_PUBSUB_CHANNEL, orjson.dumps(message, default=str)
+    )
 
 
-async def broadcast_problem_update(event: ProblemBroadcast) -> None:
-    payload = event.model_dump()
+async def broadcast_problem_update(session_id: UUID, payload: dict[str, Any]) -> None:
     message = {
         "type": "problem_updated",
         "data": payload,
         "meta": {"origin": _ORIGIN_ID},
     }
-    await connection_manager.broadcast(event.session_id, message)
+    await connection_manager.broadcast(session_id, message)
     await publish_event(message)
@@ -25,11 +25,14 @@ async def get_redis_client() -> redis.asyncio.Redis:  # type: ignore[name-define
         if settings.TESTING:
             from fakeredis.aioredis import FakeRedis  # type: ignore
 
-            _redis_client = FakeRedis(decode_responses=True)
+            _redis_client = FakeRedis()
         else:
-            _redis_client = redis.asyncio.Redis.from_url(  # type: ignore[attr-defined]
-                settings.REDIS_URL, decode_responses=True
+            # Replies stay bytes: every payload goes straight into orjson.loads.
+            pool = redis.asyncio.ConnectionPool.from_url(  # type: ignore[attr-defined]
+                settings.REDIS_URL, max_connections=settings.REDIS_MAX_CONNECTIONS
             )
+            # from_pool hands pool ownership to the client, so aclose() drains it.
+            _redis_client = redis.asyncio.Redis.from_pool(pool)  # type: ignore[attr-defined]
             try:
                 ping_result = _redis_client.ping()
                 if asyncio.iscoroutine(ping_result):
@@ -37,7 +40,7 @@ async def get_redis_client() -> redis.asyncio.Redis:  # type: ignore[name-define
             except (redis.exceptions.ConnectionError, OSError):  # type: ignore[attr-defined]
                 from fakeredis.aioredis import FakeRedis  # type: ignore
 
-                _redis_client = FakeRedis(decode_responses=True)
+                _redis_client = FakeRedis()
     return _redis_client
 
 
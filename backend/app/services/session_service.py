@@ -5,8 +5,8 @@ from __future__ import annotations
 from datetime import timedelta
 from uuid import UUID, uuid4
 
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import delete, select
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -28,61 +28,63 @@ async def create_session(db: AsyncSession, payload: SessionCreate) -> Session:
     """Persist a new interview session and its creator."""
 
     expires_at = _utcnow() + timedelta(hours=settings.SESSION_EXPIRE_HOURS)
+    creator_user = User(id=payload.creator_id or uuid4(), role=UserRole.CREATOR)
     session_obj = Session(
+        id=uuid4(),
         name=payload.name,
         language=payload.language,
         problem_text=payload.problem_text,
         expires_at=expires_at,
+        users=[creator_user],
     )
+    # post_update on Session.creator lets one flush insert both rows and then
+    # set creator_id; users is already populated, so no reload is needed.
+    session_obj.creator = creator_user
     db.add(session_obj)
-    await db.flush()
-
-    creator_id = payload.creator_id or uuid4()
-    creator_user = User(
-        id=creator_id,
-        session_id=session_obj.id,
-        role=UserRole.CREATOR,
-    )
-    db.add(creator_user)
-    await db.flush()
-
-    session_obj.creator_id = creator_user.id
     await db.commit()
-    await db.refresh(session_obj)
-
-    # Initialize ShareDB documents for this session
-    session_id_str = str(session_obj.id)
-
-    # Create code document
-    await sharedb_service.create_document(
-        collection="code",
-        doc_id=session_id_str,
-        initial_content=payload.problem_text or "# Write your solution here\n",
-    )
 
-    # Create problem document
-    await sharedb_service.create_document(
-        collection="problem",
-        doc_id=session_id_str,
-        initial_content=payload.problem_text or "",
+    # Initialize the ShareDB code and problem documents for this session
+    await sharedb_service.create_documents(
+        str(session_obj.id),
+        {
+            "code": payload.problem_text or "# Write your solution here\n",
+            "problem": payload.problem_text or "",
+        },
     )
 
     return session_obj
 
 
 async def get_session_by_id(db: AsyncSession, session_id: UUID) -> Session:
-    stmt = (
-        select(Session)
-        .where(Session.id == session_id)
-        .options(selectinload(Session.users))
+    # db.get answers from the identity map when the session is already loaded.
+    session_obj = await db.get(
+        Session,
+        session_id,
+        options=[selectinload(Session.users)],
     )
-    result = await db.execute(stmt)
-    session_obj = result.scalar_one_or_none()
     if session_obj is None:
         raise SessionNotFoundError(str(session_id))
     return session_obj
 
 
+async def ensure_session_exists(db: AsyncSession, session_id: UUID) -> None:
+    """Raise SessionNotFoundError unless the session exists; skips loading users."""
+
+    if await db.get(Session, session_id) is None:
+        raise SessionNotFoundError(str(session_id))
+
+
+async def get_problem_text(db: AsyncSession, session_id: UUID) -> str | None:
+    """Fetch only the problem statement column without loading session users."""
+
+    stmt = select(Session.problem_text).where(Session.id == session_id)
+    result = await db.execute(stmt)
+    row = result.one_or_none()
+    if row is None:
+        raise SessionNotFoundError(str(session_id))
+    return row.problem_text
+
+
 async def _ensure_creator(db: AsyncSession, session_id: UUID, user_id: UUID) -> User:
     user = await db.get(User, user_id)
     if user is None or user.session_id != session_id:
@@ -107,7 +109,6 @@ async def update_problem_text(
     session_obj = await get_session_by_id(db, session_id)
     session_obj.problem_text = problem_text
     await db.commit()
-    await db.refresh(session_obj)
     return session_obj
 
 
@@ -116,7 +117,7 @@ async def join_session(
 ) -> tuple[User, bool]:
     """Join a session and return the user along with creation flag."""
 
-    await get_session_by_id(db, session_id)
+    await ensure_session_exists(db, session_id)
 
     if user_id is not None:
         user = await db.get(User, user_id)
@@ -135,13 +136,15 @@ async def join_session(
 
 
 async def list_sessions(db: AsyncSession) -> list[Session]:
+    # Sessions hold only a handful of participants, so one JOIN beats the
+    # extra IN (...) round-trip of selectinload.
     stmt = (
         select(Session)
-        .options(selectinload(Session.users))
+        .options(joinedload(Session.users))
         .order_by(Session.created_at.desc())
     )
     result = await db.execute(stmt)
-    return list(result.scalars().all())
+    return list(result.unique().scalars().all())
 
 
 async def delete_session(db: AsyncSession, session_id: UUID) -> None:
@@ -153,14 +156,12 @@ async def delete_session(db: AsyncSession, session_id: UUID) -> None:
 async def cleanup_expired_sessions(db: AsyncSession) -> int:
     """Remove sessions whose expiry has elapsed."""
 
-    now = _utcnow()
-    stmt = select(Session).where(Session.expires_at < now)
-    result = await db.execute(stmt)
-    sessions = result.scalars().all()
-    removed = 0
-    for session_obj in sessions:
-        await db.delete(session_obj)
-        removed += 1
+    # Bulk deletes bypass the ORM cascade, and SQLite only honours
+    # ON DELETE CASCADE with foreign_keys on, so participants go first.
+    expired = select(Session.id).where(Session.expires_at < _utcnow())
+    await db.execute(delete(User).where(User.session_id.in_(expired)))
+    result = await db.execute(delete(Session).where(Session.id.in_(expired)))
+    removed = result.rowcount or 0
     if removed:
         await db.commit()
     return removed
@@ -8,18 +8,46 @@ of code and problem statements.
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
+import time
+from array import array
+from collections import OrderedDict, deque
+from collections.abc import Iterable
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Any
+from datetime import UTC, datetime, timedelta
+from typing import Any, ClassVar
 
+import orjson
+
+from app.core.config import settings
 from app.services.redis_service import get_redis_client
 
 logger = logging.getLogger(__name__)
 
+RECENT_OPERATIONS = 100
+_NO_SUBSCRIBERS: frozenset[str] = frozenset()
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _now_ns() -> int:
+    """Current time in nanoseconds, at the microsecond precision of the wire format."""
+    return time.time_ns() // 1000 * 1000
+
+
+def _ns_to_iso(timestamp_ns: int) -> str:
+    """Naive UTC ISO-8601, the format clients and stored data have always used."""
+    return (_EPOCH + timedelta(microseconds=timestamp_ns // 1000)).isoformat()
 
-@dataclass
+
+def _iso_to_ns(value: str) -> int:
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(UTC).replace(tzinfo=None)
+    return (moment - _EPOCH) // timedelta(microseconds=1) * 1000
+
+
+@dataclass(slots=True)
 class Operation:
     """Represents an operational transformation operation."""
 
@@ -28,7 +56,19 @@ class Operation:
     content: str | None = None
     version: int = 0
     user_id: str | None = None
-    timestamp: datetime = field(default_factory=datetime.utcnow)
+    timestamp_ns: int = field(default_factory=_now_ns)
+    _json: bytes | None = field(default=None, init=False, repr=False, compare=False)
+
+    def to_json(self) -> bytes:
+        """
+        Encoded ``to_dict()``; wrap in ``orjson.Fragment`` to embed it.
+
+        Encoded once and reused for the op log, pub/sub and every fan-out, so
+        only call it once the op is final (after ``apply_operation``).
+        """
+        if self._json is None:
+            self._json = orjson.dumps(self.to_dict())
+        return self._json
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -37,47 +77,203 @@ class Operation:
             "content": self.content,
             "version": self.version,
             "user_id": self.user_id,
-            "timestamp": self.timestamp.isoformat(),
+            "timestamp": _ns_to_iso(self.timestamp_ns),
         }
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> Operation:
+        timestamp = data.get("timestamp")
         return cls(
             type=data["type"],
             position=data["position"],
             content=data.get("content"),
             version=data.get("version", 0),
             user_id=data.get("user_id"),
-            timestamp=datetime.fromisoformat(
-                data.get("timestamp", datetime.utcnow().isoformat())
+            timestamp_ns=(
+                _iso_to_ns(timestamp)
+                if timestamp
+                else data.get("timestamp_ns") or _now_ns()
             ),
         )
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
+class PresenceUpdate:
+    """Latest cursor and selection of one connection on a document."""
+
+    collection: str
+    doc_id: str
+    connection_id: str
+    cursor: dict[str, int] | None = None
+    selection: dict[str, Any] | None = None
+    user_id: str | None = None
+
+
+class GapBuffer:
+    """
+    Text buffer with a movable gap at the most recent edit position.
+
+    Consecutive edits near the same spot (typing, backspacing) only touch the
+    characters between the old and new cursor instead of copying the whole text.
+    The joined text is kept until the next edit, so repeated reads are free.
+    """
+
+    __slots__ = ("_chars", "_gap_end", "_gap_start", "_text")
+
+    _MIN_GAP = 64
+
+    def __init__(self, text: str = "") -> None:
+        self._chars = array("w", text)
+        self._chars.extend("\0" * self._MIN_GAP)
+        self._gap_start = len(text)
+        self._gap_end = len(self._chars)
+        self._text: str | None = text
+
+    def __len__(self) -> int:
+        return len(self._chars) - (self._gap_end - self._gap_start)
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = (
+                self._chars[: self._gap_start].tounicode()
+                + self._chars[self._gap_end :].tounicode()
+            )
+        return self._text
+
+    def _move_gap(self, position: int) -> None:
+        if position < self._gap_start:
+            moved = self._gap_start - position
+            self._chars[self._gap_end - moved : self._gap_end] = self._chars[
+                position : self._gap_start
+            ]
+            self._gap_start = position
+            self._gap_end -= moved
+        elif position > self._gap_start:
+            moved = position - self._gap_start
+            self._chars[self._gap_start : position] = self._chars[
+                self._gap_end : self._gap_end + moved
+            ]
+            self._gap_start = position
+            self._gap_end += moved
+
+    def _ensure_gap(self, needed: int) -> None:
+        gap = self._gap_end - self._gap_start
+        if gap >= needed:
+            return
+        # Grow geometrically so repeated inserts stay amortised O(len(text)).
+        extra = max(needed - gap, len(self._chars), self._MIN_GAP)
+        self._chars[self._gap_end : self._gap_end] = array("w", "\0" * extra)
+        self._gap_end += extra
+
+    def insert(self, position: int, text: str) -> None:
+        self._text = None
+        position = min(max(position, 0), len(self))
+        self._move_gap(position)
+        self._ensure_gap(len(text))
+        end = self._gap_start + len(text)
+        self._chars[self._gap_start : end] = array("w", text)
+        self._gap_start = end
+
+    def delete(self, position: int, length: int) -> None:
+        self._text = None
+        position = min(max(position, 0), len(self))
+        self._move_gap(position)
+        self._gap_end = min(self._gap_end + max(length, 0), len(self._chars))
+
+
+@dataclass(slots=True)
 class ShareDBDocument:
     """Represents a ShareDB document (e.g., session code or problem text)."""
 
     collection: str  # e.g., "code", "problem"
     doc_id: str  # e.g., session_id
     version: int = 0
-    content: str = ""
-    operations: list[Operation] = field(default_factory=list)
-    created_at: datetime = field(default_factory=datetime.utcnow)
+    buffer: GapBuffer = field(default_factory=GapBuffer)
+    # Recent ops only; the full history lives in the Redis op list.
+    operations: deque[Operation] = field(
+        default_factory=lambda: deque(maxlen=RECENT_OPERATIONS)
+    )
+    created_at_ns: int = field(default_factory=_now_ns)
+
+    @property
+    def content(self) -> str:
+        return str(self.buffer)
+
+    @property
+    def created_at(self) -> str:
+        """Creation time in the ISO-8601 wire format."""
+        return _ns_to_iso(self.created_at_ns)
+
+    def apply(self, operation: Operation) -> None:
+        """Apply an insert/delete to the buffer without touching the version."""
+        if operation.type == "insert":
+            if operation.content is not None:
+                self.buffer.insert(operation.position, operation.content)
+        elif operation.type == "delete":
+            # For delete, we need a length in the operation
+            length = len(operation.content) if operation.content else 1
+            self.buffer.delete(operation.position, length)
 
     def to_dict(self) -> dict[str, Any]:
+        # Operations live in their own Redis list; snapshots carry content only.
         return {
             "collection": self.collection,
             "doc_id": self.doc_id,
             "version": self.version,
             "content": self.content,
-            "operations": [
-                op.to_dict() for op in self.operations[-100:]
-            ],  # Keep last 100 ops
-            "created_at": self.created_at.isoformat(),
+            "created_at": self.created_at,
         }
 
 
+class DocumentCache:
+    """
+    Bounded LRU cache of loaded documents with an idle TTL.
+
+    Evicting a document loses nothing: its last snapshot plus the ops recorded
+    since are in Redis, and ``get_document`` replays them on the next read.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple[str, str], tuple[float, ShareDBDocument]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: tuple[str, str]) -> ShareDBDocument | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if entry[0] <= now:
+            del self._entries[key]
+            return None
+        self._entries[key] = (now + self.ttl, entry[1])
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def __setitem__(self, key: tuple[str, str], doc: ShareDBDocument) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, doc)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(
+        self, key: tuple[str, str], default: ShareDBDocument | None = None
+    ) -> ShareDBDocument | None:
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
 class ShareDBService:
     """
     Service for managing ShareDB documents with Redis backend.
@@ -89,14 +285,27 @@ class ShareDBService:
     - Real-time synchronization via WebSocket
     """
 
-    # In-memory document store (in production, this would be Redis)
-    _documents: dict[str, ShareDBDocument] = {}
-    _subscribers: dict[str, set[str]] = {}  # doc_key -> set of connection_ids
+    # In-memory document cache in front of Redis, keyed by (collection, doc_id);
+    # Redis keys are only built when Redis is hit.
+    _documents = DocumentCache(
+        maxsize=settings.SHAREDB_CACHE_MAX_DOCUMENTS,
+        ttl=settings.SHAREDB_CACHE_TTL_SECONDS,
+    )
+    # Connection ids per document. Copy-on-write: every op and cursor move reads
+    # these, (un)subscribes are rare.
+    _subscribers: ClassVar[dict[tuple[str, str], frozenset[str]]] = {}
+    # Cold loads in flight, so concurrent cache misses share one copy.
+    _loading: ClassVar[dict[tuple[str, str], asyncio.Task[ShareDBDocument | None]]] = {}
 
     REDIS_PREFIX = "sharedb:"
     OPS_PREFIX = f"{REDIS_PREFIX}ops:"
     DOCS_PREFIX = f"{REDIS_PREFIX}docs:"
     SUBS_PREFIX = f"{REDIS_PREFIX}subs:"
+    SNAPSHOT_INTERVAL = max(settings.SHAREDB_SNAPSHOT_INTERVAL, 1)
+    # Replay needs every op since the last snapshot, so never trim below that.
+    HISTORY_LIMIT = max(settings.SHAREDB_HISTORY_LIMIT, SNAPSHOT_INTERVAL)
+    PRESENCE_TTL_SECONDS = 300
+    HISTORY_READ_ATTEMPTS = 3
 
     @classmethod
     async def create_document(
@@ -109,50 +318,123 @@ class ShareDBService:
         doc = ShareDBDocument(
             collection=collection,
             doc_id=doc_id,
-            content=initial_content,
+            buffer=GapBuffer(initial_content),
         )
 
         redis = await get_redis_client()
         doc_key = f"{cls.DOCS_PREFIX}{collection}:{doc_id}"
 
         # Store document in Redis
-        await redis.set(doc_key, json.dumps(doc.to_dict()))
+        await redis.set(doc_key, orjson.dumps(doc.to_dict()))
 
         # Store in memory cache
-        cls._documents[f"{collection}:{doc_id}"] = doc
+        cls._documents[(collection, doc_id)] = doc
 
-        logger.info(f"Created ShareDB document: {collection}:{doc_id}")
+        logger.info("Created ShareDB document: %s:%s", collection, doc_id)
         return doc
 
+    @classmethod
+    async def create_documents(
+        cls,
+        doc_id: str,
+        initial_contents: dict[str, str],
+    ) -> list[ShareDBDocument]:
+        """Create one document per collection for ``doc_id`` in a single round-trip."""
+        docs = [
+            ShareDBDocument(
+                collection=collection,
+                doc_id=doc_id,
+                buffer=GapBuffer(content),
+            )
+            for collection, content in initial_contents.items()
+        ]
+
+        redis = await get_redis_client()
+        async with redis.pipeline(transaction=False) as pipe:
+            for doc in docs:
+                pipe.set(
+                    f"{cls.DOCS_PREFIX}{doc.collection}:{doc_id}",
+                    orjson.dumps(doc.to_dict()),
+                )
+            await pipe.execute()
+
+        for doc in docs:
+            cls._documents[(doc.collection, doc_id)] = doc
+
+        logger.info(
+            "Created ShareDB documents %s for %s", ", ".join(initial_contents), doc_id
+        )
+        return docs
+
     @classmethod
     async def get_document(
         cls,
         collection: str,
         doc_id: str,
     ) -> ShareDBDocument | None:
-        """Fetch a ShareDB document."""
-        redis = await get_redis_client()
-        doc_key = f"{cls.DOCS_PREFIX}{collection}:{doc_id}"
+        """
+        Fetch a ShareDB document.
 
+        Cached documents are returned without suspending, so a caller can
+        check the version and apply an op in the same step without a lock.
+        """
         # Check memory cache first
-        cache_key = f"{collection}:{doc_id}"
-        if cache_key in cls._documents:
-            return cls._documents[cache_key]
+        cache_key = (collection, doc_id)
+        doc = cls._documents.get(cache_key)
+        if doc is not None:
+            return doc
+
+        # Two ops racing on a cold document must not each load their own copy
+        # and both pass the version check, so they wait on a single load.
+        task = cls._loading.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(cls._load_document(collection, doc_id))
+            cls._loading[cache_key] = task
+            task.add_done_callback(lambda _: cls._loading.pop(cache_key, None))
+        # A cancelled caller must not cancel the load others are waiting on.
+        return await asyncio.shield(task)
 
-        # Fetch from Redis
-        data = await redis.get(doc_key)
+    @classmethod
+    async def _load_document(
+        cls,
+        collection: str,
+        doc_id: str,
+    ) -> ShareDBDocument | None:
+        """Rebuild a document from its Redis snapshot and recent operations."""
+        redis = await get_redis_client()
+        data = await redis.get(f"{cls.DOCS_PREFIX}{collection}:{doc_id}")
         if not data:
             return None
 
-        doc_data = json.loads(data)
+        doc_data = orjson.loads(data)
+        created_at = doc_data.get("created_at")
         doc = ShareDBDocument(
             collection=doc_data["collection"],
             doc_id=doc_data["doc_id"],
             version=doc_data["version"],
-            content=doc_data["content"],
+            buffer=GapBuffer(doc_data["content"]),
+            created_at_ns=(
+                _iso_to_ns(created_at)
+                if created_at
+                else doc_data.get("created_at_ns") or _now_ns()
+            ),
         )
 
-        # Cache in memory
+        # Snapshots are only written every SNAPSHOT_INTERVAL ops, so replay the
+        # operations recorded since the last one.
+        ops_key = f"{cls.OPS_PREFIX}{collection}:{doc_id}"
+        recent = await redis.lrange(ops_key, 0, cls.SNAPSHOT_INTERVAL - 1)
+        pending = [Operation.from_dict(orjson.loads(op)) for op in recent]
+        for operation in reversed(pending):
+            if operation.version > doc.version:
+                doc.apply(operation)
+                doc.version = operation.version
+
+        # Cache in memory, unless the document was created while loading
+        cache_key = (collection, doc_id)
+        cached = cls._documents.get(cache_key)
+        if cached is not None:
+            return cached
         cls._documents[cache_key] = doc
         return doc
 
@@ -162,82 +444,109 @@ class ShareDBService:
         collection: str,
         doc_id: str,
         operation: Operation,
-    ) -> bool:
+    ) -> ShareDBDocument | None:
         """
         Apply an operation to a document using Operational Transformation.
 
-        Returns True if successful, False if version conflict.
+        Returns the updated document, or None if it is missing or the
+        operation's version conflicts.
         """
-        doc = await cls.get_document(collection, doc_id)
-        if not doc:
-            logger.warning(f"Document not found: {collection}:{doc_id}")
-            return False
-
-        # Version conflict check
-        if operation.version != doc.version:
-            logger.warning(
-                f"Version conflict for {collection}:{doc_id}: "
-                f"expected {doc.version}, got {operation.version}"
-            )
-            return False
-
-        # Apply operation
-        if operation.type == "insert":
-            if operation.content is not None:
-                doc.content = (
-                    doc.content[: operation.position]
-                    + operation.content
-                    + doc.content[operation.position :]
-                )
-        elif operation.type == "delete":
-            # For delete, we need a length in the operation
-            length = len(operation.content) if operation.content else 1
-            doc.content = (
-                doc.content[: operation.position]
-                + doc.content[operation.position + length :]
-            )
-
-        # Update version
-        doc.version += 1
-        operation.version = doc.version
-        doc.operations.append(operation)
-
-        # Persist to Redis
-        redis = await get_redis_client()
-        doc_key = f"{cls.DOCS_PREFIX}{collection}:{doc_id}"
-        ops_key = f"{cls.OPS_PREFIX}{collection}:{doc_id}"
+        doc, applied = await cls._apply_operations(collection, doc_id, [operation])
+        return doc if applied else None
 
-        await redis.set(doc_key, json.dumps(doc.to_dict()))
-        await redis.lpush(ops_key, json.dumps(operation.to_dict()))
+    @classmethod
+    async def apply_operations(
+        cls,
+        collection: str,
+        doc_id: str,
+        operations: list[Operation],
+    ) -> int:
+        """
+        Apply consecutive operations to a document in order.
 
-        # Publish to subscribers
-        await cls._publish_operation(collection, doc_id, operation)
+        Each operation must target the version produced by the one before it.
+        Application stops at the first version conflict; the operations applied
+        up to that point are persisted together in one round-trip.
 
-        logger.info(
-            f"Applied operation to {collection}:{doc_id} "
-            f"(v{doc.version}): {operation.type} at pos {operation.position}"
-        )
-        return True
+        Returns the number of operations applied.
+        """
+        _, applied = await cls._apply_operations(collection, doc_id, operations)
+        return applied
 
     @classmethod
-    async def _publish_operation(
+    async def _apply_operations(
         cls,
         collection: str,
         doc_id: str,
-        operation: Operation,
-    ) -> None:
-        """Publish operation to subscribers."""
+        operations: list[Operation],
+    ) -> tuple[ShareDBDocument | None, int]:
+        doc = await cls.get_document(collection, doc_id)
+        if not doc:
+            logger.warning("Document not found: %s:%s", collection, doc_id)
+            return None, 0
+
+        start_version = doc.version
+        applied: list[Operation] = []
+        for operation in operations:
+            # Version conflict check
+            if operation.version != doc.version:
+                logger.warning(
+                    "Version conflict for %s:%s: expected %s, got %s",
+                    collection,
+                    doc_id,
+                    doc.version,
+                    operation.version,
+                )
+                break
+
+            # Apply operation
+            doc.apply(operation)
+
+            # Update version
+            doc.version += 1
+            operation.version = doc.version
+            doc.operations.append(operation)
+            applied.append(operation)
+
+        if not applied:
+            return doc, 0
+
+        # Persist and publish in one round-trip: the op log on every edit, a
+        # full snapshot whenever the batch crosses a snapshot boundary
         redis = await get_redis_client()
+        ops_key = f"{cls.OPS_PREFIX}{collection}:{doc_id}"
         channel = f"{cls.REDIS_PREFIX}{collection}:{doc_id}"
+        op_jsons = [operation.to_json() for operation in applied]
+
+        async with redis.pipeline(transaction=False) as pipe:
+            # LPUSH with several values leaves the last one at the head,
+            # keeping the list newest first.
+            pipe.lpush(ops_key, *op_jsons)
+            pipe.ltrim(ops_key, 0, cls.HISTORY_LIMIT - 1)
+            if (
+                doc.version // cls.SNAPSHOT_INTERVAL
+                != start_version // cls.SNAPSHOT_INTERVAL
+            ):
+                doc_key = f"{cls.DOCS_PREFIX}{collection}:{doc_id}"
+                pipe.set(doc_key, orjson.dumps(doc.to_dict()))
+            for op_json in op_jsons:
+                message = {
+                    "type": "op",
+                    "collection": collection,
+                    "doc_id": doc_id,
+                    "operation": orjson.Fragment(op_json),
+                }
+                pipe.publish(channel, orjson.dumps(message, default=str))
+            await pipe.execute()
 
-        message = {
-            "type": "op",
-            "collection": collection,
-            "doc_id": doc_id,
-            "operation": operation.to_dict(),
-        }
-
-        await redis.publish(channel, json.dumps(message, default=str))
+        logger.info(
+            "Applied %s operation(s) to %s:%s (v%s)",
+            len(applied),
+            collection,
+            doc_id,
+            doc.version,
+        )
+        return doc, len(applied)
 
     @classmethod
     async def subscribe(
@@ -247,13 +556,10 @@ class ShareDBService:
         connection_id: str,
     ) -> None:
         """Subscribe a connection to document changes."""
-        doc_key = f"{collection}:{doc_id}"
-
-        if doc_key not in cls._subscribers:
-            cls._subscribers[doc_key] = set()
-
-        cls._subscribers[doc_key].add(connection_id)
-        logger.info(f"Subscribed {connection_id} to {doc_key}")
+        key = (collection, doc_id)
+        subscribers = cls._subscribers.get(key, _NO_SUBSCRIBERS)
+        cls._subscribers[key] = subscribers | {connection_id}
+        logger.info("Subscribed %s to %s:%s", connection_id, collection, doc_id)
 
     @classmethod
     async def unsubscribe(
@@ -263,17 +569,20 @@ class ShareDBService:
         connection_id: str,
     ) -> None:
         """Unsubscribe a connection from document changes."""
-        doc_key = f"{collection}:{doc_id}"
-
-        if doc_key in cls._subscribers:
-            cls._subscribers[doc_key].discard(connection_id)
-            logger.info(f"Unsubscribed {connection_id} from {doc_key}")
+        key = (collection, doc_id)
+        subscribers = cls._subscribers.get(key)
+        if subscribers is not None:
+            remaining = subscribers - {connection_id}
+            if remaining:
+                cls._subscribers[key] = remaining
+            else:
+                del cls._subscribers[key]
+            logger.info("Unsubscribed %s from %s:%s", connection_id, collection, doc_id)
 
     @classmethod
-    def get_subscribers(cls, collection: str, doc_id: str) -> set[str]:
-        """Get all subscribers to a document."""
-        doc_key = f"{collection}:{doc_id}"
-        return cls._subscribers.get(doc_key, set()).copy()
+    def get_subscribers(cls, collection: str, doc_id: str) -> frozenset[str]:
+        """Get an immutable snapshot of all subscribers to a document."""
+        return cls._subscribers.get((collection, doc_id), _NO_SUBSCRIBERS)
 
     @classmethod
     async def get_operation_history(
@@ -281,23 +590,56 @@ class ShareDBService:
         collection: str,
         doc_id: str,
         from_version: int = 0,
+        limit: int | None = None,
     ) -> list[Operation]:
-        """Fetch operation history from a specific version."""
+        """
+        Fetch operation history after ``from_version``, oldest first.
+
+        With ``limit`` only the first ``limit`` operations after
+        ``from_version`` are returned, so large histories can be paged.
+        Operations older than ``HISTORY_LIMIT`` have been trimmed; a request
+        reaching back past them starts at the oldest operation still kept.
+        """
         redis = await get_redis_client()
         ops_key = f"{cls.OPS_PREFIX}{collection}:{doc_id}"
 
-        # Get all operations (they're stored in reverse order due to lpush)
-        ops_data = await redis.lrange(ops_key, 0, -1)
-
-        if not ops_data:
-            return []
+        # Operations are stored newest first (lpush) with contiguous versions,
+        # so the head version locates the page and only that range is read.
+        for _ in range(cls.HISTORY_READ_ATTEMPTS):
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.lindex(ops_key, 0)
+                pipe.llen(ops_key)
+                head, length = await pipe.execute()
+            if head is None:
+                return []
+            head_version = orjson.loads(head)["version"]
+            # Clamp to the retained list, or the page would start past its end.
+            newer = min(head_version - from_version, length)
+            if newer <= 0:
+                return []
+            start = newer - limit if limit is not None and limit < newer else 0
+            page = [
+                Operation.from_dict(orjson.loads(op))
+                for op in await redis.lrange(ops_key, start, newer - 1)
+            ]
+            # A concurrent lpush shifts every index; locate the page again.
+            if not page or page[0].version == head_version - start:
+                break
+        else:
+            # Versions that never line up mean the list is not contiguous
+            # (e.g. another process pushed ops); keep what was read instead
+            # of spinning on Redis.
+            logger.warning(
+                "Non-contiguous history for %s:%s; filtering by version",
+                collection,
+                doc_id,
+            )
+            page = [op for op in page if op.version > from_version]
+            page.sort(key=lambda op: op.version, reverse=True)
 
-        operations = [Operation.from_dict(json.loads(op)) for op in ops_data]
         # Reverse to get chronological order
-        operations.reverse()
-
-        # Filter by version
-        return [op for op in operations if op.version > from_version]
+        page.reverse()
+        return page
 
     @classmethod
     async def clear_document(
@@ -309,15 +651,13 @@ class ShareDBService:
         redis = await get_redis_client()
         doc_key = f"{cls.DOCS_PREFIX}{collection}:{doc_id}"
         ops_key = f"{cls.OPS_PREFIX}{collection}:{doc_id}"
-        cache_key = f"{collection}:{doc_id}"
 
         await redis.delete(doc_key)
         await redis.delete(ops_key)
 
-        if cache_key in cls._documents:
-            del cls._documents[cache_key]
+        cls._documents.pop((collection, doc_id), None)
 
-        logger.info(f"Cleared ShareDB document: {collection}:{doc_id}")
+        logger.info("Cleared ShareDB document: %s:%s", collection, doc_id)
 
     @classmethod
     async def get_presence(
@@ -329,11 +669,11 @@ class ShareDBService:
         redis = await get_redis_client()
         presence_key = f"{cls.REDIS_PREFIX}presence:{collection}:{doc_id}"
 
-        data = await redis.get(presence_key)
-        if not data:
-            return {}
-
-        return json.loads(data)
+        entries = await redis.hgetall(presence_key)
+        return {
+            connection_id.decode(): orjson.loads(entry)
+            for connection_id, entry in entries.items()
+        }
 
     @classmethod
     async def update_presence(
@@ -346,23 +686,43 @@ class ShareDBService:
         user_id: str | None = None,
     ) -> None:
         """Update presence information (cursor, selection) for a connection."""
-        redis = await get_redis_client()
-        presence_key = f"{cls.REDIS_PREFIX}presence:{collection}:{doc_id}"
-
-        # Get current presence data
-        data = await redis.get(presence_key)
-        presence = json.loads(data) if data else {}
-
-        # Update connection's presence
-        presence[connection_id] = {
-            "cursor": cursor,
-            "selection": selection,
-            "user_id": user_id,
-            "timestamp": datetime.utcnow().isoformat(),
-        }
+        await cls.update_presences(
+            [
+                PresenceUpdate(
+                    collection, doc_id, connection_id, cursor, selection, user_id
+                )
+            ]
+        )
 
-        # Store with TTL (5 minutes)
-        await redis.setex(presence_key, 300, json.dumps(presence, default=str))
+    @classmethod
+    async def update_presences(cls, updates: Iterable[PresenceUpdate]) -> None:
+        """Write several presence updates to Redis in one round trip."""
+        redis = await get_redis_client()
+        timestamp = _ns_to_iso(_now_ns())
+        presence_keys: set[str] = set()
+
+        # One hash field per connection, so concurrent updates never overwrite
+        # each other; the whole hash expires after PRESENCE_TTL_SECONDS idle.
+        async with redis.pipeline(transaction=True) as pipe:
+            for update in updates:
+                presence_key = (
+                    f"{cls.REDIS_PREFIX}presence:{update.collection}:{update.doc_id}"
+                )
+                entry = {
+                    "cursor": update.cursor,
+                    "selection": update.selection,
+                    "user_id": update.user_id,
+                    "timestamp": timestamp,
+                }
+                pipe.hset(
+                    presence_key,
+                    update.connection_id,
+                    orjson.dumps(entry, default=str),
+                )
+                presence_keys.add(presence_key)
+            for presence_key in presence_keys:
+                pipe.expire(presence_key, cls.PRESENCE_TTL_SECONDS)
+            await pipe.execute()
 
 
 # Singleton instance
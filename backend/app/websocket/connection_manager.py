@@ -3,17 +3,93 @@
 from __future__ import annotations
 
 import asyncio
-from collections import defaultdict
+import logging
+from collections import defaultdict, deque
 from typing import DefaultDict, Set
 from uuid import UUID, uuid4
 
+import orjson
 from fastapi import WebSocket
 
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# "Try again later": the client fell too far behind and should resync.
+_SLOW_CONSUMER_CLOSE_CODE = 1013
+_BATCH_PREFIX = '{"type":"batch","messages":['
+
+
+class _OutboundQueue:
+    """
+    Per-connection send queue flushed by at most one drain task at a time.
+
+    When more than one frame is waiting, they go out together as a single
+    ``{"type": "batch", "messages": [...]}`` frame that clients unwrap.
+    """
+
+    __slots__ = ("_closed", "_closer", "_drainer", "_pending", "_websocket", "maxsize")
+
+    def __init__(self, websocket: WebSocket, maxsize: int) -> None:
+        self._websocket = websocket
+        self._pending: deque[str] = deque()
+        self._drainer: asyncio.Task[None] | None = None
+        self._closer: asyncio.Task[None] | None = None
+        self._closed = False
+        self.maxsize = maxsize
+
+    def put(self, text: str) -> bool:
+        if self._closed:
+            return False
+        if len(self._pending) >= self.maxsize:
+            # Dropping ops would desync the client's document, so cut it off
+            # and let it reconnect and refetch instead.
+            # The close task gets its own slot: the cancelled drainer still
+            # runs its ``finally`` and would otherwise drop the reference.
+            self.cancel()
+            self._closer = asyncio.create_task(self._close_slow_consumer())
+            return False
+        self._pending.append(text)
+        if self._drainer is None:
+            self._drainer = asyncio.create_task(self._drain())
+        return True
+
+    async def _drain(self) -> None:
+        try:
+            while self._pending:
+                if len(self._pending) == 1:
+                    frame = self._pending.popleft()
+                else:
+                    # Merge everything queued since the last send into one frame;
+                    # entries are already JSON, so they can be spliced as-is.
+                    frame = f"{_BATCH_PREFIX}{','.join(self._pending)}]}}"
+                    self._pending.clear()
+                await self._websocket.send_text(frame)
+        except Exception as exc:  # noqa: BLE001 - socket is gone; drop the backlog
+            logger.debug("Dropping outbound messages for closed socket: %s", exc)
+            self._pending.clear()
+        finally:
+            self._drainer = None
+
+    async def _close_slow_consumer(self) -> None:
+        try:
+            await self._websocket.close(code=_SLOW_CONSUMER_CLOSE_CODE)
+        except Exception as exc:  # noqa: BLE001 - already closed
+            logger.debug("Slow consumer socket already closed: %s", exc)
+
+    def cancel(self) -> None:
+        self._closed = True
+        if self._drainer is not None:
+            self._drainer.cancel()
+            self._drainer = None
+        self._pending.clear()
+
 
 class SessionConnectionManager:
     def __init__(self) -> None:
         self._connections: DefaultDict[UUID, Set[WebSocket]] = defaultdict(set)
         self._connection_map: dict[str, WebSocket] = {}  # connection_id -> websocket
+        self._outbound: dict[str, _OutboundQueue] = {}  # connection_id -> queue
         self._lock = asyncio.Lock()
         self.origin_id = str(uuid4())
 
@@ -26,8 +102,13 @@ class SessionConnectionManager:
 
         await websocket.accept()
         async with self._lock:
-            self._connections[session_id].add(websocket)
+            connections = self._connections[session_id]
+            connections.add(websocket)
             self._connection_map[connection_id] = websocket
+            self._outbound[connection_id] = _OutboundQueue(
+                websocket, settings.WEBSOCKET_SEND_QUEUE_SIZE
+            )
+            count = len(connections)
 
         await self.broadcast(
             session_id,
@@ -35,7 +116,7 @@ class SessionConnectionManager:
                 "type": "user_join",
                 "data": {
                     "session_id": str(session_id),
-                    "connections": await self.active_connections(session_id),
+                    "connections": count,
                 },
             },
             sender=websocket,
@@ -52,9 +133,19 @@ class SessionConnectionManager:
                 connections.remove(websocket)
                 if not connections:
                     self._connections.pop(session_id, None)
+            count = len(connections) if connections else 0
 
             if connection_id and connection_id in self._connection_map:
                 del self._connection_map[connection_id]
+            outbound = (
+                self._outbound.pop(connection_id, None) if connection_id else None
+            )
+            if outbound is not None:
+                outbound.cancel()
+
+        if not count:
+            # Nobody is left to hear about it.
+            return
 
         await self.broadcast(
             session_id,
@@ -62,7 +153,7 @@ class SessionConnectionManager:
                 "type": "user_leave",
                 "data": {
                     "session_id": str(session_id),
-                    "connections": await self.active_connections(session_id),
+                    "connections": count,
                 },
             },
         )
@@ -74,14 +165,33 @@ class SessionConnectionManager:
         sender: WebSocket | None = None,
     ) -> None:
         async with self._lock:
-            connections = list(self._connections.get(session_id, set()))
-        for connection in connections:
-            if sender is not None and connection is sender:
-                continue
-            try:
-                await connection.send_json(message)
-            except RuntimeError:  # pragma: no cover - client disconnected mid-send
-                continue
+            targets = [
+                connection
+                for connection in self._connections.get(session_id, ())
+                if connection is not sender
+            ]
+        if not targets:
+            return
+        # Encode once per broadcast; text frames keep the client protocol unchanged.
+        payload = orjson.dumps(message).decode()
+        results = await asyncio.gather(
+            *(connection.send_text(payload) for connection in targets),
+            return_exceptions=True,
+        )
+        failed = [
+            connection
+            for connection, result in zip(targets, results, strict=True)
+            if isinstance(result, Exception)
+        ]
+        if failed:
+            # Sockets that dropped mid-send stop receiving broadcasts; their
+            # handler still runs the regular disconnect when it notices.
+            async with self._lock:
+                connections = self._connections.get(session_id)
+                if connections is not None:
+                    connections.difference_update(failed)
+                    if not connections:
+                        self._connections.pop(session_id, None)
 
     async def send_to_connection(
         self,
@@ -89,6 +199,12 @@ class SessionConnectionManager:
         message: dict,
     ) -> bool:
         """Send a message to a specific connection by ID. Returns True if successful."""
+        return await self.send_text_to_connection(
+            connection_id, orjson.dumps(message).decode()
+        )
+
+    async def send_text_to_connection(self, connection_id: str, text: str) -> bool:
+        """Send an already-encoded frame to a connection. Returns True if successful."""
         async with self._lock:
             websocket = self._connection_map.get(connection_id)
 
@@ -96,11 +212,22 @@ class SessionConnectionManager:
             return False
 
         try:
-            await websocket.send_json(message)
+            await websocket.send_text(text)
             return True
         except RuntimeError:
             return False
 
+    def enqueue_text(self, connection_id: str, text: str) -> bool:
+        """
+        Queue an already-encoded frame for a connection without awaiting the send.
+
+        Returns False if the connection is unknown or its queue overflowed.
+        """
+        outbound = self._outbound.get(connection_id)
+        if outbound is None:
+            return False
+        return outbound.put(text)
+
     async def active_connections(self, session_id: UUID) -> int:
         async with self._lock:
             return len(self._connections.get(session_id, set()))
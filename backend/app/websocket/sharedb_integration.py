@@ -7,19 +7,159 @@ including fetch, subscribe, and op (operation) messages.
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
+from collections.abc import Awaitable, Callable
 from typing import Any
 
-from app.services.sharedb_service import Operation, sharedb_service
+import orjson
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.services.sharedb_service import Operation, PresenceUpdate, sharedb_service
 from app.websocket.connection_manager import connection_manager
 
 logger = logging.getLogger(__name__)
 
+# Replies for malformed requests, shared across calls and never mutated.
+_FETCH_MISSING_IDS = {"type": "fetch-error", "error": "Missing collection or doc_id"}
+_SUBSCRIBE_MISSING_IDS = {
+    "type": "subscribe-error",
+    "error": "Missing collection or doc_id",
+}
+_UNSUBSCRIBE_MISSING_IDS = {
+    "type": "unsubscribe-error",
+    "error": "Missing collection or doc_id",
+}
+_OP_MISSING_IDS = {
+    "type": "op-error",
+    "error": "Missing collection, doc_id, or operation",
+}
+_OP_INVALID = {
+    "type": "op-error",
+    "error": "Invalid operation: expected insert/delete with integer position",
+}
+_OP_BATCH_INVALID = {
+    "type": "op-error",
+    "error": "operations must be a non-empty list of valid operations",
+}
+_MAX_BATCH_OPERATIONS = max(settings.SHAREDB_MAX_BATCH_OPERATIONS, 1)
+_HISTORY_MISSING_IDS = {
+    "type": "history-error",
+    "error": "Missing collection or doc_id",
+}
+_HISTORY_INVALID = {
+    "type": "history-error",
+    "error": "from_version must be a non-negative integer and limit a positive one",
+}
+_HISTORY_PAGE_SIZE = max(settings.SHAREDB_HISTORY_PAGE_SIZE, 1)
+_CURSOR_MISSING_IDS = {"type": "cursor-error", "error": "Missing collection or doc_id"}
+_PRESENCE_MISSING_IDS = {
+    "type": "presence-error",
+    "error": "Missing collection or doc_id",
+}
+
+
+_OP_TYPES = frozenset({"insert", "delete"})
+
+
+def _parse_operation(op_data: Any, user_id: str | None) -> Operation | None:
+    """Build an Operation from a client payload, or None if its shape is wrong."""
+    if type(op_data) is not dict:
+        return None
+    op_type = op_data.get("type")
+    position = op_data.get("position")
+    content = op_data.get("content")
+    version = op_data.get("version", 0)
+    if (
+        op_type not in _OP_TYPES
+        or type(position) is not int
+        or position < 0
+        or type(version) is not int
+        or (content is not None and type(content) is not str)
+    ):
+        return None
+    return Operation(
+        type=op_type,
+        position=position,
+        content=content,
+        version=version,
+        user_id=user_id,
+    )
+
+
+def _other_subscribers(
+    collection: str, doc_id: str, connection_id: str
+) -> frozenset[str]:
+    """Subscribers of a document, excluding ``connection_id`` itself."""
+    return sharedb_service.get_subscribers(collection, doc_id) - {connection_id}
+
+
+class _CursorCoalescer:
+    """
+    Holds the latest cursor message per (collection, doc_id, connection_id).
+
+    Carets move many times a second; observers only need the most recent
+    position, so pending messages are replaced and fanned out once per tick.
+    The same positions are written to presence in a single Redis round trip.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._pending: dict[tuple[str, str, str], dict[str, Any]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._presence_writes: set[asyncio.Task[None]] = set()
+
+    def submit(self, key: tuple[str, str, str], message: dict[str, Any]) -> None:
+        self._pending[key] = message
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.interval, self._flush)
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        for (collection, doc_id, connection_id), message in pending.items():
+            targets = _other_subscribers(collection, doc_id, connection_id)
+            if targets:
+                ShareDBHandler._fan_out(targets, message)
+
+        task = asyncio.ensure_future(self._record_presence(pending))
+        self._presence_writes.add(task)
+        task.add_done_callback(self._presence_writes.discard)
+
+    @staticmethod
+    async def _record_presence(
+        pending: dict[tuple[str, str, str], dict[str, Any]],
+    ) -> None:
+        try:
+            await sharedb_service.update_presences(
+                PresenceUpdate(
+                    collection,
+                    doc_id,
+                    connection_id,
+                    message["cursor"],
+                    message["selection"],
+                    message["user_id"],
+                )
+                for (collection, doc_id, connection_id), message in pending.items()
+            )
+        except RedisError as e:
+            logger.error("Error recording presence: %s", e)
+
 
 class ShareDBHandler:
     """Handles ShareDB-related WebSocket messages."""
 
+    @staticmethod
+    def _fan_out(targets: frozenset[str], message: dict[str, Any]) -> None:
+        """Queue ``message`` for every connection in ``targets``."""
+        # Encode once for the whole fan-out rather than once per recipient.
+        payload = orjson.dumps(message).decode()
+        enqueue = connection_manager.enqueue_text
+        for subscriber_id in targets:
+            enqueue(subscriber_id, payload)
+
     @staticmethod
     async def handle_fetch(
         message: dict[str, Any],
@@ -32,36 +172,46 @@ class ShareDBHandler:
         {
             "type": "fetch",
             "collection": "code",
-            "doc_id": "session-uuid"
+            "doc_id": "session-uuid",
+            "subscribe": true
         }
+
+        With ``subscribe`` set, the connection is also subscribed to the
+        document, saving the separate 'subscribe' round-trip. No operation can
+        land between the snapshot and the subscription, and the response
+        carries ``"subscribed": true``.
         """
-        try:
-            collection = message.get("collection")
-            doc_id = message.get("doc_id")
+        collection = message.get("collection")
+        doc_id = message.get("doc_id")
+        subscribe = message.get("subscribe") is True
 
-            if not collection or not doc_id:
-                return {
-                    "type": "fetch-error",
-                    "error": "Missing collection or doc_id",
-                }
+        if not collection or not doc_id:
+            return _FETCH_MISSING_IDS
 
+        try:
             doc = await sharedb_service.get_document(collection, doc_id)
 
             if not doc:
                 # Create empty document if it doesn't exist
                 doc = await sharedb_service.create_document(collection, doc_id)
 
-            return {
+            response = {
                 "type": "fetch-response",
                 "collection": collection,
                 "doc_id": doc_id,
                 "version": doc.version,
                 "content": doc.content,
-                "timestamp": doc.created_at.isoformat(),
+                "timestamp": doc.created_at,
             }
+            if subscribe:
+                # subscribe() never suspends, so this runs in the same step as
+                # the snapshot read above.
+                await sharedb_service.subscribe(collection, doc_id, connection_id)
+                response["subscribed"] = True
+            return response
 
         except Exception as e:
-            logger.error(f"Error handling fetch: {e}")
+            logger.error("Error handling fetch: %s", e)
             return {
                 "type": "fetch-error",
                 "error": str(e),
@@ -83,16 +233,13 @@ class ShareDBHandler:
             "doc_id": "session-uuid"
         }
         """
-        try:
-            collection = message.get("collection")
-            doc_id = message.get("doc_id")
+        collection = message.get("collection")
+        doc_id = message.get("doc_id")
 
-            if not collection or not doc_id:
-                return {
-                    "type": "subscribe-error",
-                    "error": "Missing collection or doc_id",
-                }
+        if not collection or not doc_id:
+            return _SUBSCRIBE_MISSING_IDS
 
+        try:
             # Subscribe connection to document
             await sharedb_service.subscribe(collection, doc_id, connection_id)
 
@@ -103,7 +250,7 @@ class ShareDBHandler:
             }
 
         except Exception as e:
-            logger.error(f"Error handling subscribe: {e}")
+            logger.error("Error handling subscribe: %s", e)
             return {
                 "type": "subscribe-error",
                 "error": str(e),
@@ -124,16 +271,13 @@ class ShareDBHandler:
             "doc_id": "session-uuid"
         }
         """
-        try:
-            collection = message.get("collection")
-            doc_id = message.get("doc_id")
+        collection = message.get("collection")
+        doc_id = message.get("doc_id")
 
-            if not collection or not doc_id:
-                return {
-                    "type": "unsubscribe-error",
-                    "error": "Missing collection or doc_id",
-                }
+        if not collection or not doc_id:
+            return _UNSUBSCRIBE_MISSING_IDS
 
+        try:
             await sharedb_service.unsubscribe(collection, doc_id, connection_id)
 
             return {
@@ -143,7 +287,7 @@ class ShareDBHandler:
             }
 
         except Exception as e:
-            logger.error(f"Error handling unsubscribe: {e}")
+            logger.error("Error handling unsubscribe: %s", e)
             return {
                 "type": "unsubscribe-error",
                 "error": str(e),
@@ -171,32 +315,22 @@ class ShareDBHandler:
             }
         }
         """
-        try:
-            collection = message.get("collection")
-            doc_id = message.get("doc_id")
-            op_data = message.get("operation")
+        collection = message.get("collection")
+        doc_id = message.get("doc_id")
+        op_data = message.get("operation")
 
-            if not collection or not doc_id or not op_data:
-                return {
-                    "type": "op-error",
-                    "error": "Missing collection, doc_id, or operation",
-                }
+        if not collection or not doc_id or not op_data:
+            return _OP_MISSING_IDS
 
-            # Create operation object
-            operation = Operation(
-                type=op_data.get("type"),
-                position=op_data.get("position"),
-                content=op_data.get("content"),
-                version=op_data.get("version", 0),
-                user_id=user_id,
-            )
+        operation = _parse_operation(op_data, user_id)
+        if operation is None:
+            return _OP_INVALID
 
+        try:
             # Apply operation
-            success = await sharedb_service.apply_operation(
-                collection, doc_id, operation
-            )
+            doc = await sharedb_service.apply_operation(collection, doc_id, operation)
 
-            if not success:
+            if doc is None:
                 return {
                     "type": "op-error",
                     "error": "Version conflict - operation not applied",
@@ -204,31 +338,115 @@ class ShareDBHandler:
                     "doc_id": doc_id,
                 }
 
-            # Broadcast operation to all subscribers except sender
-            subscribers = sharedb_service.get_subscribers(collection, doc_id)
-            broadcast_message = {
-                "type": "remote-op",
+            # Broadcast operation to all subscribers except sender; a solo
+            # editor has nobody to notify, so skip building the frame.
+            targets = _other_subscribers(collection, doc_id, connection_id)
+            if targets:
+                ShareDBHandler._fan_out(
+                    targets,
+                    {
+                        "type": "remote-op",
+                        "collection": collection,
+                        "doc_id": doc_id,
+                        "operation": orjson.Fragment(operation.to_json()),
+                        "from_connection": connection_id,
+                    },
+                )
+
+            return {
+                "type": "op-ack",
                 "collection": collection,
                 "doc_id": doc_id,
-                "operation": operation.to_dict(),
-                "from_connection": connection_id,
+                "version": operation.version,
             }
 
-            for subscriber_id in subscribers:
-                if subscriber_id != connection_id:
-                    await connection_manager.send_to_connection(
-                        subscriber_id, broadcast_message
+        except Exception as e:
+            logger.error("Error handling operation: %s", e)
+            return {
+                "type": "op-error",
+                "error": str(e),
+            }
+
+    @staticmethod
+    async def handle_operation_batch(
+        message: dict[str, Any],
+        connection_id: str,
+        user_id: str | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        Handle 'op-batch' message - client submits consecutive text operations.
+
+        Message format:
+        {
+            "type": "op-batch",
+            "collection": "code",
+            "doc_id": "session-uuid",
+            "operations": [
+                {"type": "insert", "position": 0, "content": "a", "version": 5},
+                {"type": "insert", "position": 1, "content": "b", "version": 6}
+            ]
+        }
+
+        The operations are applied in order and persisted in one round-trip.
+        If one conflicts, the ones before it stay applied and the error reply
+        reports how many were.
+        """
+        collection = message.get("collection")
+        doc_id = message.get("doc_id")
+        ops_data = message.get("operations")
+
+        if not collection or not doc_id:
+            return _OP_MISSING_IDS
+        if (
+            type(ops_data) is not list
+            or not ops_data
+            or len(ops_data) > _MAX_BATCH_OPERATIONS
+        ):
+            return _OP_BATCH_INVALID
+        operations = [_parse_operation(op_data, user_id) for op_data in ops_data]
+        if None in operations:
+            return _OP_BATCH_INVALID
+
+        try:
+            applied = await sharedb_service.apply_operations(
+                collection, doc_id, operations
+            )
+
+            targets = _other_subscribers(collection, doc_id, connection_id)
+            if applied and targets:
+                # Queued back to back, so the outbound queue merges them into
+                # a single batch frame per subscriber.
+                for operation in operations[:applied]:
+                    ShareDBHandler._fan_out(
+                        targets,
+                        {
+                            "type": "remote-op",
+                            "collection": collection,
+                            "doc_id": doc_id,
+                            "operation": orjson.Fragment(operation.to_json()),
+                            "from_connection": connection_id,
+                        },
                     )
 
+            if applied < len(operations):
+                return {
+                    "type": "op-error",
+                    "error": "Version conflict - operation not applied",
+                    "collection": collection,
+                    "doc_id": doc_id,
+                    "applied": applied,
+                }
+
             return {
                 "type": "op-ack",
                 "collection": collection,
                 "doc_id": doc_id,
-                "version": operation.version,
+                "version": operations[-1].version,
+                "applied": applied,
             }
 
         except Exception as e:
-            logger.error(f"Error handling operation: {e}")
+            logger.error("Error handling operation batch: %s", e)
             return {
                 "type": "op-error",
                 "error": str(e),
@@ -247,22 +465,32 @@ class ShareDBHandler:
             "type": "history",
             "collection": "code",
             "doc_id": "session-uuid",
-            "from_version": 0
+            "from_version": 0,
+            "limit": 100
         }
-        """
-        try:
-            collection = message.get("collection")
-            doc_id = message.get("doc_id")
-            from_version = message.get("from_version", 0)
 
-            if not collection or not doc_id:
-                return {
-                    "type": "history-error",
-                    "error": "Missing collection or doc_id",
-                }
+        At most ``limit`` operations (capped by SHAREDB_HISTORY_PAGE_SIZE) are
+        returned; when the page is full, ``next_from`` is the version to pass
+        as ``from_version`` to fetch the next page, otherwise it is null.
+        """
+        collection = message.get("collection")
+        doc_id = message.get("doc_id")
+        from_version = message.get("from_version", 0)
+        limit = message.get("limit")
+
+        if not collection or not doc_id:
+            return _HISTORY_MISSING_IDS
+        if type(from_version) is not int or from_version < 0:
+            return _HISTORY_INVALID
+        page_size = _HISTORY_PAGE_SIZE
+        if limit is not None:
+            if type(limit) is not int or limit <= 0:
+                return _HISTORY_INVALID
+            page_size = min(limit, page_size)
 
+        try:
             history = await sharedb_service.get_operation_history(
-                collection, doc_id, from_version
+                collection, doc_id, from_version, page_size
             )
 
             return {
@@ -270,11 +498,12 @@ class ShareDBHandler:
                 "collection": collection,
                 "doc_id": doc_id,
                 "from_version": from_version,
-                "operations": [op.to_dict() for op in history],
+                "operations": [orjson.Fragment(op.to_json()) for op in history],
+                "next_from": history[-1].version if len(history) == page_size else None,
             }
 
         except Exception as e:
-            logger.error(f"Error handling history: {e}")
+            logger.error("Error handling history: %s", e)
             return {
                 "type": "history-error",
                 "error": str(e),
@@ -282,7 +511,7 @@ class ShareDBHandler:
 
     @staticmethod
     async def handle_sharedb_message(
-        data: str,
+        message: dict[str, Any],
         connection_id: str,
         session_id: str,
         user_id: str | None = None,
@@ -290,46 +519,27 @@ class ShareDBHandler:
         """
         Route ShareDB messages to appropriate handlers.
 
+        ``message`` is the decoded frame; the WebSocket endpoint parses each
+        frame exactly once before picking a route.
+
         Supported message types:
         - fetch: Get current document state
         - subscribe: Start receiving updates
         - unsubscribe: Stop receiving updates
         - op: Submit a text operation
+        - op-batch: Submit consecutive text operations in one message
         - history: Get operation history
         - cursor: Update cursor position
         """
-        try:
-            message = json.loads(data)
-        except json.JSONDecodeError:
-            logger.error(f"Invalid JSON in ShareDB message: {data}")
-            return None
-
         msg_type = message.get("type")
-
-        if msg_type == "fetch":
-            return await ShareDBHandler.handle_fetch(message, connection_id)
-        elif msg_type == "subscribe":
-            return await ShareDBHandler.handle_subscribe(
-                message, connection_id, session_id
-            )
-        elif msg_type == "unsubscribe":
-            return await ShareDBHandler.handle_unsubscribe(message, connection_id)
-        elif msg_type == "op":
-            return await ShareDBHandler.handle_operation(
-                message, connection_id, user_id
-            )
-        elif msg_type == "history":
-            return await ShareDBHandler.handle_history(message, connection_id)
-        elif msg_type == "cursor":
-            return await ShareDBHandler.handle_cursor_update(
-                message, connection_id, session_id, user_id
-            )
-        else:
-            logger.warning(f"Unknown ShareDB message type: {msg_type}")
+        handler = _DISPATCH.get(msg_type)
+        if handler is None:
+            logger.warning("Unknown ShareDB message type: %s", msg_type)
             return {
                 "type": "error",
                 "error": f"Unknown message type: {msg_type}",
             }
+        return await handler(message, connection_id, session_id, user_id)
 
     @staticmethod
     async def handle_cursor_update(
@@ -356,41 +566,30 @@ class ShareDBHandler:
             }
         }
         """
-        try:
-            collection = message.get("collection")
-            doc_id = message.get("doc_id")
-            cursor = message.get("cursor")
-            selection = message.get("selection")
+        collection = message.get("collection")
+        doc_id = message.get("doc_id")
+        cursor = message.get("cursor")
+        selection = message.get("selection")
 
-            if not collection or not doc_id:
-                return {
-                    "type": "cursor-error",
-                    "error": "Missing collection or doc_id",
-                }
+        if not collection or not doc_id:
+            return _CURSOR_MISSING_IDS
 
-            # Update presence in ShareDB
-            await sharedb_service.update_presence(
-                collection, doc_id, connection_id, cursor, selection, user_id
+        try:
+            # Only the latest position per connection is broadcast and
+            # recorded as presence each tick
+            _cursor_coalescer.submit(
+                (collection, doc_id, connection_id),
+                {
+                    "type": "remote-cursor",
+                    "collection": collection,
+                    "doc_id": doc_id,
+                    "connection_id": connection_id,
+                    "user_id": user_id,
+                    "cursor": cursor,
+                    "selection": selection,
+                },
             )
 
-            # Broadcast to all subscribers except sender
-            subscribers = sharedb_service.get_subscribers(collection, doc_id)
-            broadcast_message = {
-                "type": "remote-cursor",
-                "collection": collection,
-                "doc_id": doc_id,
-                "connection_id": connection_id,
-                "user_id": user_id,
-                "cursor": cursor,
-                "selection": selection,
-            }
-
-            for subscriber_id in subscribers:
-                if subscriber_id != connection_id:
-                    await connection_manager.send_to_connection(
-                        subscriber_id, broadcast_message
-                    )
-
             return {
                 "type": "cursor-ack",
                 "collection": collection,
@@ -398,7 +597,7 @@ class ShareDBHandler:
             }
 
         except Exception as e:
-            logger.error(f"Error handling cursor update: {e}")
+            logger.error("Error handling cursor update: %s", e)
             return {
                 "type": "cursor-error",
                 "error": str(e),
@@ -419,16 +618,13 @@ class ShareDBHandler:
             "doc_id": "session-uuid"
         }
         """
-        try:
-            collection = message.get("collection")
-            doc_id = message.get("doc_id")
+        collection = message.get("collection")
+        doc_id = message.get("doc_id")
 
-            if not collection or not doc_id:
-                return {
-                    "type": "presence-error",
-                    "error": "Missing collection or doc_id",
-                }
+        if not collection or not doc_id:
+            return _PRESENCE_MISSING_IDS
 
+        try:
             presence = await sharedb_service.get_presence(collection, doc_id)
 
             return {
@@ -439,8 +635,38 @@ class ShareDBHandler:
             }
 
         except Exception as e:
-            logger.error(f"Error handling presence query: {e}")
+            logger.error("Error handling presence query: %s", e)
             return {
                 "type": "presence-error",
                 "error": str(e),
             }
+
+
+_cursor_coalescer = _CursorCoalescer(settings.SHAREDB_CURSOR_FLUSH_MS / 1000)
+
+_Route = Callable[
+    [dict[str, Any], str, str, str | None], Awaitable[dict[str, Any] | None]
+]
+
+# Message type -> handler, normalized to (message, connection_id, session_id, user_id).
+_DISPATCH: dict[str, _Route] = {
+    "fetch": lambda message, conn, session, user: ShareDBHandler.handle_fetch(
+        message, conn
+    ),
+    "subscribe": lambda message, conn, session, user: ShareDBHandler.handle_subscribe(
+        message, conn, session
+    ),
+    "unsubscribe": lambda message, conn, session, user: (
+        ShareDBHandler.handle_unsubscribe(message, conn)
+    ),
+    "op": lambda message, conn, session, user: ShareDBHandler.handle_operation(
+        message, conn, user
+    ),
+    "op-batch": lambda message, conn, session, user: (
+        ShareDBHandler.handle_operation_batch(message, conn, user)
+    ),
+    "history": lambda message, conn, session, user: ShareDBHandler.handle_history(
+        message, conn
+    ),
+    "cursor": ShareDBHandler.handle_cursor_update,
+}
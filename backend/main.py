@@ -1,5 +1,10 @@
+import uvicorn
+
+
 def main():
-    print("Hello from backend!")
+    # uvloop and httptools ship with uvicorn[standard]; pin them rather than
+    # letting "auto" fall back to the pure-Python loop and parser.
+    uvicorn.run("app.main:app", loop="uvloop", http="httptools")
 
 
 if __name__ == "__main__":
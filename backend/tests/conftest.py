@@ -1,57 +1,104 @@
 import asyncio
 import os
-from collections.abc import AsyncGenerator, Generator
+from collections.abc import AsyncGenerator, Callable
+from functools import partial
 
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import StaticPool
 
 # Set testing flag before importing app
 os.environ["TESTING"] = "true"
 
+# Run async tests on uvloop, the loop the server runs on (see main.py). It is
+# a dev dependency everywhere except Windows, which keeps the default loop.
+try:
+    import uvloop
+except ImportError:
+    pass
+else:
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
 # noqa: E402 - Must import after setting TESTING env var
 from app.api.deps import get_db_session  # noqa: E402
 from app.core.config import settings  # noqa: E402
 from app.db.base import Base  # noqa: E402
 from app.db.session import get_session  # noqa: E402
 from app.main import app  # noqa: E402
+from app.services.sharedb_service import ShareDBService  # noqa: E402
 
-TEST_DATABASE_URL = settings.TEST_DATABASE_URL or "sqlite+aiosqlite:///:memory:"
-
+# pytest-xdist runs each worker as its own process; without it this is "master".
+WORKER_ID = os.environ.get("PYTEST_XDIST_WORKER", "master")
 
-@pytest.fixture(scope="session")
-def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+# A named shared-cache in-memory database: every connection sees the same schema,
+# so the tables are created exactly once per run. It lives in the worker's own
+# memory, so parallel workers never share it.
+TEST_DATABASE_URL = (
+    settings.TEST_DATABASE_URL
+    or f"sqlite+aiosqlite:///file:testdb_{WORKER_ID}?mode=memory&cache=shared&uri=true"
+)
+# A shared server database gives each worker its own schema instead.
+TEST_SCHEMA = f"test_{WORKER_ID}"
 
 
 @pytest_asyncio.fixture(scope="session")
 async def test_engine():
-    engine = create_async_engine(TEST_DATABASE_URL, echo=False)
+    if TEST_DATABASE_URL.startswith("sqlite"):
+        engine = create_async_engine(
+            TEST_DATABASE_URL,
+            echo=False,
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False, "uri": True},
+        )
+
+        # pysqlite's own transaction handling defeats SAVEPOINT; let SQLAlchemy
+        # emit BEGIN itself so each test can roll back its nested transaction.
+        @event.listens_for(engine.sync_engine, "connect")
+        def _disable_driver_transactions(dbapi_connection, _record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine.sync_engine, "begin")
+        def _begin(connection):
+            connection.exec_driver_sql("BEGIN")
+    else:
+        engine = create_async_engine(
+            TEST_DATABASE_URL,
+            echo=False,
+            connect_args={"server_settings": {"search_path": TEST_SCHEMA}},
+        )
+        async with engine.begin() as conn:
+            await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{TEST_SCHEMA}"'))
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield engine
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+        if engine.dialect.name == "sqlite":
+            await conn.run_sync(Base.metadata.drop_all)
+        else:
+            await conn.execute(text(f'DROP SCHEMA IF EXISTS "{TEST_SCHEMA}" CASCADE'))
     await engine.dispose()
 
 
-@pytest_asyncio.fixture()
-async def session_factory(
-    test_engine,
-) -> AsyncGenerator[async_sessionmaker[AsyncSession], None]:
-    factory = async_sessionmaker(
-        test_engine, expire_on_commit=False, class_=AsyncSession
-    )
-    yield factory
+@pytest.fixture(scope="session")
+def session_factory(test_engine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(test_engine, expire_on_commit=False, class_=AsyncSession)
 
 
 @pytest_asyncio.fixture()
-async def db_session(session_factory) -> AsyncGenerator[AsyncSession, None]:
-    async with session_factory() as session:
-        yield session
+async def db_connection(test_engine) -> AsyncGenerator[AsyncConnection, None]:
+    """A connection whose outer transaction is rolled back after the test."""
+    async with test_engine.connect() as connection:
+        transaction = await connection.begin()
+        yield connection
+        await transaction.rollback()
 
 
 @pytest.fixture(autouse=True)
@@ -67,8 +114,57 @@ def override_get_session(session_factory):
     app.dependency_overrides.pop(get_db_session, None)
 
 
+@pytest.fixture()
+def test_sessions(
+    session_factory, db_connection, override_get_session
+) -> Callable[[], AsyncSession]:
+    """
+    Sessions whose commits only release a savepoint on ``db_connection``.
+
+    Requesting this also routes the app's sessions through it, so nothing a
+    test writes outlives the test. Tests driving the app through TestClient
+    run it on another event loop and keep the engine-bound sessions.
+    """
+    factory = partial(
+        session_factory, bind=db_connection, join_transaction_mode="create_savepoint"
+    )
+
+    async def _get_test_session() -> AsyncGenerator[AsyncSession, None]:
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = _get_test_session
+    app.dependency_overrides[get_db_session] = _get_test_session
+    return factory
+
+
 @pytest_asyncio.fixture()
-async def client() -> AsyncGenerator[AsyncClient, None]:
-    transport = ASGITransport(app=app)
+async def db_session(test_sessions) -> AsyncGenerator[AsyncSession, None]:
+    async with test_sessions() as session:
+        yield session
+
+
+@pytest.fixture(autouse=True)
+def reset_sharedb_state():
+    yield
+    # Documents and subscriptions live on the service class for the process.
+    ShareDBService._documents.clear()
+    ShareDBService._subscribers.clear()
+
+
+@pytest.fixture(scope="session")
+def transport() -> ASGITransport:
+    return ASGITransport(app=app)
+
+
+@pytest_asyncio.fixture(scope="session")
+async def http_client(transport) -> AsyncGenerator[AsyncClient, None]:
     async with AsyncClient(transport=transport, base_url="http://test") as http_client:
         yield http_client
+
+
+@pytest.fixture()
+def client(http_client, test_sessions) -> AsyncClient:
+    # One client serves the whole run; only its cookie jar is per test.
+    http_client.cookies.clear()
+    return http_client
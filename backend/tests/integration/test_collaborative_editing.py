@@ -5,12 +5,21 @@ Tests ShareDB code synchronization, problem text sync, cursor tracking,
 and presence updates with 5+ concurrent users.
 """
 
-import json
+import asyncio
+from datetime import datetime
 from typing import Any
 
+import orjson
 import pytest
 
-from app.services.sharedb_service import ShareDBService, Operation
+from app.services.redis_service import get_redis_client
+from app.services.sharedb_service import (
+    DocumentCache,
+    Operation,
+    ShareDBDocument,
+    ShareDBService,
+)
+from app.websocket.sharedb_integration import ShareDBHandler, _cursor_coalescer
 
 
 class MockWebSocket:
@@ -18,14 +27,19 @@ class MockWebSocket:
 
     def __init__(self, connection_id: str):
         self.connection_id = connection_id
-        self.sent_messages: list[dict[str, Any]] = []
+        # Raw frames are kept as sent and only decoded when a test reads them.
+        self.sent_messages: list[str | dict[str, Any]] = []
         self.ready_state = 1  # OPEN
 
     async def send_json(self, data: dict[str, Any]) -> None:
         self.sent_messages.append(data)
 
     def send(self, data: str) -> None:
-        self.sent_messages.append(json.loads(data))
+        self.sent_messages.append(data)
+
+    def parsed(self, index: int) -> dict[str, Any]:
+        message = self.sent_messages[index]
+        return orjson.loads(message) if isinstance(message, str) else message
 
 
 @pytest.mark.asyncio
@@ -49,12 +63,12 @@ async def test_sharedb_code_synchronization_two_users(client) -> None:
     # User 1: Apply code operation
     op1 = Operation(type="insert", position=0, content="def hello()")
     success1 = await ShareDBService.apply_operation("code", session_id, op1)
-    assert success1 is True
+    assert success1 is not None
 
     # User 2: Apply more code operation
     op2 = Operation(type="insert", position=11, content=":\n    pass", version=1)
     success2 = await ShareDBService.apply_operation("code", session_id, op2)
-    assert success2 is True
+    assert success2 is not None
 
     # Verify final document
     final_doc = await ShareDBService.get_document("code", session_id)
@@ -82,7 +96,7 @@ async def test_concurrent_problem_text_updates_three_users(client) -> None:
     # Three users make updates
     op1 = Operation(type="insert", position=0, content="## Problem: Two Sum\n\n")
     success1 = await ShareDBService.apply_operation("problem", session_id, op1)
-    assert success1 is True
+    assert success1 is not None
 
     op2 = Operation(
         type="insert",
@@ -91,7 +105,7 @@ async def test_concurrent_problem_text_updates_three_users(client) -> None:
         version=1,
     )
     success2 = await ShareDBService.apply_operation("problem", session_id, op2)
-    assert success2 is True
+    assert success2 is not None
 
     op3 = Operation(
         type="insert",
@@ -100,7 +114,7 @@ async def test_concurrent_problem_text_updates_three_users(client) -> None:
         version=2,
     )
     success3 = await ShareDBService.apply_operation("problem", session_id, op3)
-    assert success3 is True
+    assert success3 is not None
 
     # Verify final content
     final_doc = await ShareDBService.get_document("problem", session_id)
@@ -125,11 +139,19 @@ async def test_cursor_position_broadcasting_five_users(client) -> None:
     code_doc = await ShareDBService.create_document("code", session_id)
     assert code_doc is not None
 
-    # Simulate 5 users being present
-    for i in range(5):
-        cursor_data = {"line": i + 1, "column": i * 5}
-        # In production, this would be tracked via presence data
-        assert cursor_data is not None
+    # 5 users report their cursors at once; the updates are independent
+    async with asyncio.TaskGroup() as tg:
+        for i in range(5):
+            cursor_data = {"line": i + 1, "column": i * 5}
+            tg.create_task(
+                ShareDBService.update_presence(
+                    "code", session_id, f"conn{i + 1}", cursor=cursor_data
+                )
+            )
+
+    presence = await ShareDBService.get_presence("code", session_id)
+    assert len(presence) == 5
+    assert presence["conn5"]["cursor"] == {"line": 5, "column": 20}
 
     # Verify session still exists
     get_response = await client.get(f"/api/v1/sessions/{session_id}")
@@ -174,6 +196,203 @@ async def test_operation_history_retrieval(client) -> None:
     assert len(history) == 4
 
 
+@pytest.mark.asyncio
+async def test_operation_history_is_paged(client) -> None:
+    """Test history requests return bounded pages with a continuation version."""
+    session_id = "history-pages"
+    await ShareDBService.create_document("code", session_id, "")
+    for version in range(5):
+        op = Operation(type="insert", position=version, content="x", version=version)
+        assert await ShareDBService.apply_operation("code", session_id, op)
+
+    request = {"collection": "code", "doc_id": session_id, "limit": 2}
+    first = await ShareDBHandler.handle_history(request, "conn1")
+    first = orjson.loads(orjson.dumps(first))
+    assert [op["version"] for op in first["operations"]] == [1, 2]
+    assert first["next_from"] == 2
+
+    last = await ShareDBHandler.handle_history({**request, "from_version": 4}, "conn1")
+    last = orjson.loads(orjson.dumps(last))
+    assert [op["version"] for op in last["operations"]] == [5]
+    assert last["next_from"] is None
+
+    invalid = await ShareDBHandler.handle_history({**request, "limit": 0}, "conn1")
+    assert invalid["type"] == "history-error"
+
+
+@pytest.mark.asyncio
+async def test_history_pages_past_the_trimmed_operations(client, monkeypatch) -> None:
+    """Test paging from before the retained history starts at the oldest kept op."""
+    monkeypatch.setattr(ShareDBService, "HISTORY_LIMIT", 3)
+    session_id = "history-trimmed"
+    await ShareDBService.create_document("code", session_id, "")
+    for version in range(5):
+        op = Operation(type="insert", position=version, content="x", version=version)
+        assert await ShareDBService.apply_operation("code", session_id, op)
+
+    request = {"collection": "code", "doc_id": session_id, "limit": 2}
+    first = await ShareDBHandler.handle_history(request, "conn1")
+    first = orjson.loads(orjson.dumps(first))
+    assert [op["version"] for op in first["operations"]] == [3, 4]
+    assert first["next_from"] == 4
+
+    last = await ShareDBHandler.handle_history({**request, "from_version": 4}, "conn1")
+    last = orjson.loads(orjson.dumps(last))
+    assert [op["version"] for op in last["operations"]] == [5]
+    assert last["next_from"] is None
+
+
+@pytest.mark.asyncio
+async def test_history_read_gives_up_on_a_non_contiguous_list(client) -> None:
+    """Test a gap in stored versions ends the re-read loop instead of spinning."""
+    session_id = "history-gap"
+    await ShareDBService.create_document("code", session_id, "")
+    for version in range(3):
+        op = Operation(type="insert", position=version, content="x", version=version)
+        assert await ShareDBService.apply_operation("code", session_id, op)
+
+    redis = await get_redis_client()
+    stray = Operation(type="insert", position=0, content="y", version=10)
+    await redis.lpush(f"{ShareDBService.OPS_PREFIX}code:{session_id}", stray.to_json())
+
+    history = await asyncio.wait_for(
+        ShareDBService.get_operation_history("code", session_id, 0, 2), timeout=5
+    )
+    assert [op.version for op in history] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_history_page_survives_a_concurrent_edit(client, monkeypatch) -> None:
+    """Test an op landing between reading the head and the page shifts nothing."""
+    session_id = "history-race"
+    await ShareDBService.create_document("code", session_id, "")
+    for version in range(3):
+        op = Operation(type="insert", position=version, content="x", version=version)
+        assert await ShareDBService.apply_operation("code", session_id, op)
+
+    redis = await get_redis_client()
+    lrange = redis.lrange
+    racing = [Operation(type="insert", position=3, content="y", version=3)]
+
+    async def lrange_after_edit(*args):
+        if racing:
+            await ShareDBService.apply_operation("code", session_id, racing.pop())
+        return await lrange(*args)
+
+    monkeypatch.setattr(redis, "lrange", lrange_after_edit)
+    history = await ShareDBService.get_operation_history(
+        "code", session_id, from_version=1, limit=2
+    )
+    assert [op.version for op in history] == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_document_rebuilt_from_snapshot_and_operations(client) -> None:
+    """Test that a document evicted from memory is rebuilt from Redis."""
+    # Create session via API
+    create_response = await client.post(
+        "/api/v1/sessions",
+        json={"name": "Replay Test", "language": "python3.13"},
+    )
+    assert create_response.status_code == 201
+    session_id = create_response.json()["id"]
+
+    await ShareDBService.create_document("code", session_id, "print()")
+
+    op1 = Operation(type="insert", position=6, content="'hi'")
+    await ShareDBService.apply_operation("code", session_id, op1)
+    op2 = Operation(type="delete", position=0, content="print", version=1)
+    await ShareDBService.apply_operation("code", session_id, op2)
+    op3 = Operation(type="insert", position=0, content="repr", version=2)
+    await ShareDBService.apply_operation("code", session_id, op3)
+
+    # Drop the in-memory copy so the next read goes to Redis
+    ShareDBService._documents.pop(("code", session_id))
+
+    rebuilt = await ShareDBService.get_document("code", session_id)
+    assert rebuilt is not None
+    assert rebuilt.content == "repr('hi')"
+    assert rebuilt.version == 3
+
+
+def test_document_cache_evicts_least_recently_used_and_idle() -> None:
+    """Test the in-memory document cache stays bounded."""
+    cache = DocumentCache(maxsize=2, ttl=60)
+    docs = {name: ShareDBDocument(collection="code", doc_id=name) for name in "abc"}
+
+    cache[("code", "a")] = docs["a"]
+    cache[("code", "b")] = docs["b"]
+    assert cache.get(("code", "a")) is docs["a"]  # "b" is now least recent
+    cache[("code", "c")] = docs["c"]
+
+    assert ("code", "b") not in cache
+    assert cache.get(("code", "a")) is docs["a"]
+    assert len(cache) == 2
+
+    expired = DocumentCache(maxsize=2, ttl=0)
+    expired[("code", "a")] = docs["a"]
+    assert expired.get(("code", "a")) is None
+
+
+def test_document_edits_use_character_offsets() -> None:
+    """Test in-place edits address characters, not UTF-8 bytes."""
+    doc = ShareDBDocument(collection="code", doc_id="unicode")
+    doc.apply(Operation(type="insert", position=0, content="naïve 😀 code"))
+    doc.apply(Operation(type="insert", position=8, content="→"))
+    doc.apply(Operation(type="delete", position=0, content="naïve "))
+
+    assert doc.content == "😀 →code"
+    assert len(doc.buffer) == len(doc.content)
+
+
+def test_document_content_is_reused_until_the_next_edit() -> None:
+    """Test reading content twice does not rebuild the text."""
+    doc = ShareDBDocument(collection="code", doc_id="cached")
+    doc.apply(Operation(type="insert", position=0, content="abc"))
+
+    assert doc.content is doc.content
+
+    doc.apply(Operation(type="delete", position=1, content="b"))
+    assert doc.content == "ac"
+
+
+def test_operation_json_round_trips() -> None:
+    """Test the cached operation encoding escapes content and round-trips."""
+    operation = Operation(
+        type="insert", position=3, content='say "hi"\n', version=7, user_id="u1"
+    )
+
+    encoded = operation.to_json()
+
+    assert encoded is operation.to_json()
+    assert orjson.loads(encoded) == operation.to_dict()
+    assert Operation.from_dict(orjson.loads(encoded)) == operation
+
+
+@pytest.mark.asyncio
+async def test_wire_timestamps_stay_iso_strings(client) -> None:
+    """Test ops, fetch responses and presence keep their ISO ``timestamp`` field."""
+    session_id = "wire-timestamps"
+    await ShareDBService.create_document("code", session_id, "")
+    operation = Operation(type="insert", position=0, content="x")
+    await ShareDBService.apply_operation("code", session_id, operation)
+    await ShareDBService.update_presence("code", session_id, "conn1", cursor={})
+
+    fetched = await ShareDBHandler.handle_fetch(
+        {"collection": "code", "doc_id": session_id}, "conn1"
+    )
+    presence = await ShareDBService.get_presence("code", session_id)
+    for timestamp in (
+        operation.to_dict()["timestamp"],
+        fetched["timestamp"],
+        presence["conn1"]["timestamp"],
+    ):
+        datetime.fromisoformat(timestamp)
+    assert Operation.from_dict(operation.to_dict()).timestamp_ns == (
+        operation.timestamp_ns
+    )
+
+
 @pytest.mark.asyncio
 async def test_version_conflict_detection(client) -> None:
     """Test that version conflicts are detected and rejected."""
@@ -192,12 +411,12 @@ async def test_version_conflict_detection(client) -> None:
     # Apply first operation
     op1 = Operation(type="insert", position=0, content="# Code v1")
     success1 = await ShareDBService.apply_operation("code", session_id, op1)
-    assert success1 is True
+    assert success1 is not None
 
     # Apply second operation with correct version
     op2 = Operation(type="insert", position=9, content="\n# Code v2", version=1)
     success2 = await ShareDBService.apply_operation("code", session_id, op2)
-    assert success2 is True
+    assert success2 is not None
 
     # Verify both are in final content
     final_doc = await ShareDBService.get_document("code", session_id)
@@ -207,6 +426,43 @@ async def test_version_conflict_detection(client) -> None:
     assert final_doc.version == 2
 
 
+@pytest.mark.asyncio
+async def test_racing_ops_on_a_cold_document_conflict(client, monkeypatch) -> None:
+    """Test two ops for the same version on an uncached document can't both win."""
+    session_id = "cold-race"
+    await ShareDBService.create_document("code", session_id, "")
+    ShareDBService._documents.pop(("code", session_id))
+
+    # FakeRedis replies without suspending; make reads wait for their reply
+    # like a real server, so both loads read Redis before either op persists.
+    def with_latency(read):
+        async def delayed_read(*args, **kwargs):
+            reply = await read(*args, **kwargs)
+            await asyncio.sleep(0)
+            return reply
+
+        return delayed_read
+
+    redis = await get_redis_client()
+    monkeypatch.setattr(redis, "get", with_latency(redis.get))
+    monkeypatch.setattr(redis, "lrange", with_latency(redis.lrange))
+
+    results = await asyncio.gather(
+        ShareDBService.apply_operation(
+            "code", session_id, Operation(type="insert", position=0, content="a")
+        ),
+        ShareDBService.apply_operation(
+            "code", session_id, Operation(type="insert", position=0, content="b")
+        ),
+    )
+
+    assert sum(result is not None for result in results) == 1
+    doc = await ShareDBService.get_document("code", session_id)
+    assert doc is not None
+    assert doc.version == 1
+    assert doc.content in {"a", "b"}
+
+
 @pytest.mark.asyncio
 async def test_subscriber_count_accuracy(client) -> None:
     """Test that subscriber count is accurately tracked."""
@@ -225,14 +481,14 @@ async def test_subscriber_count_accuracy(client) -> None:
     assert code_doc is not None
     assert problem_doc is not None
 
-    # Subscribe multiple connections
-    await ShareDBService.subscribe("code", session_id, "conn1")
-    await ShareDBService.subscribe("code", session_id, "conn2")
-    await ShareDBService.subscribe("code", session_id, "conn3")
+    # Subscribe multiple connections concurrently
+    async with asyncio.TaskGroup() as tg:
+        for connection_id in ("conn1", "conn2", "conn3"):
+            tg.create_task(ShareDBService.subscribe("code", session_id, connection_id))
 
     # Get subscriber count
     subscribers = ShareDBService.get_subscribers("code", session_id)
-    assert len(subscribers) >= 1
+    assert len(subscribers) == 3
 
     # Unsubscribe
     await ShareDBService.unsubscribe("code", session_id, "conn1")
@@ -240,6 +496,24 @@ async def test_subscriber_count_accuracy(client) -> None:
     assert len(subscribers_after) >= 0
 
 
+@pytest.mark.asyncio
+async def test_subscriber_snapshots_are_unaffected_by_later_changes(client) -> None:
+    """Test a subscriber snapshot being fanned out to never changes under it."""
+    await ShareDBService.subscribe("code", "snapshots", "conn1")
+    await ShareDBService.subscribe("code", "snapshots", "conn2")
+    before = ShareDBService.get_subscribers("code", "snapshots")
+
+    await ShareDBService.unsubscribe("code", "snapshots", "conn1")
+    await ShareDBService.subscribe("code", "snapshots", "conn3")
+
+    assert before == {"conn1", "conn2"}
+    assert ShareDBService.get_subscribers("code", "snapshots") == {"conn2", "conn3"}
+
+    await ShareDBService.unsubscribe("code", "snapshots", "conn2")
+    await ShareDBService.unsubscribe("code", "snapshots", "conn3")
+    assert ShareDBService.get_subscribers("code", "snapshots") == frozenset()
+
+
 @pytest.mark.asyncio
 async def test_concurrent_deletion_operations(client) -> None:
     """Test concurrent deletion operations are merged correctly."""
@@ -257,15 +531,16 @@ async def test_concurrent_deletion_operations(client) -> None:
     )
     assert code_doc is not None
 
-    # Apply deletion operations
+    # Apply deletion operations; the updated document comes back directly
     op1 = Operation(type="delete", position=0, content="line1\n")
-    success1 = await ShareDBService.apply_operation("code", session_id, op1)
-    assert success1 is True
-
-    # Verify document was updated
-    final_doc = await ShareDBService.get_document("code", session_id)
+    final_doc = await ShareDBService.apply_operation("code", session_id, op1)
     assert final_doc is not None
-    assert "line2" in final_doc.content
+    assert final_doc.version == 1
+    assert final_doc.content == "line2\nline3"
+
+    # A stale version is rejected
+    stale = Operation(type="delete", position=0, content="line2\n")
+    assert await ShareDBService.apply_operation("code", session_id, stale) is None
 
 
 @pytest.mark.asyncio
@@ -288,11 +563,11 @@ async def test_rapid_successive_updates_six_users(client) -> None:
         op = Operation(
             type="insert",
             position=0,
-            content=f"# User {i+1} update\n",
+            content=f"# User {i + 1} update\n",
             version=i,
         )
         success = await ShareDBService.apply_operation("code", session_id, op)
-        assert success is True
+        assert success is not None
 
     # Verify final content contains updates
     final_doc = await ShareDBService.get_document("code", session_id)
@@ -300,6 +575,70 @@ async def test_rapid_successive_updates_six_users(client) -> None:
     assert final_doc.version == 6
 
 
+@pytest.mark.asyncio
+async def test_operation_batch_from_six_users(client) -> None:
+    """Test a batch of updates is applied and persisted in a single call."""
+    session_id = "op-batch"
+    await ShareDBService.create_document("code", session_id, "")
+
+    response = await ShareDBHandler.handle_operation_batch(
+        {
+            "collection": "code",
+            "doc_id": session_id,
+            "operations": [
+                {
+                    "type": "insert",
+                    "position": 0,
+                    "content": f"# User {i + 1} update\n",
+                    "version": i,
+                }
+                for i in range(6)
+            ],
+        },
+        "conn1",
+    )
+
+    assert response["type"] == "op-ack"
+    assert response["version"] == 6
+    assert response["applied"] == 6
+
+    # Rebuilt from Redis, the batch matches applying the ops one by one
+    ShareDBService._documents.pop(("code", session_id))
+    rebuilt = await ShareDBService.get_document("code", session_id)
+    assert rebuilt is not None
+    assert rebuilt.version == 6
+    assert rebuilt.content.startswith("# User 6 update\n")
+    history = await ShareDBService.get_operation_history("code", session_id)
+    assert [op.version for op in history] == [1, 2, 3, 4, 5, 6]
+
+
+@pytest.mark.asyncio
+async def test_operation_batch_stops_at_version_conflict(client) -> None:
+    """Test a batch applies the operations before a conflict and reports them."""
+    session_id = "op-batch-conflict"
+    await ShareDBService.create_document("code", session_id, "")
+
+    response = await ShareDBHandler.handle_operation_batch(
+        {
+            "collection": "code",
+            "doc_id": session_id,
+            "operations": [
+                {"type": "insert", "position": 0, "content": "a", "version": 0},
+                {"type": "insert", "position": 1, "content": "b", "version": 5},
+                {"type": "insert", "position": 1, "content": "c", "version": 1},
+            ],
+        },
+        "conn1",
+    )
+
+    assert response["type"] == "op-error"
+    assert response["applied"] == 1
+    doc = await ShareDBService.get_document("code", session_id)
+    assert doc is not None
+    assert doc.content == "a"
+    assert doc.version == 1
+
+
 @pytest.mark.asyncio
 async def test_presence_ttl_expiration(client) -> None:
     """Test presence data TTL expiration."""
@@ -333,5 +672,140 @@ async def test_presence_ttl_expiration(client) -> None:
     assert "conn1" in presence
 
 
+@pytest.mark.asyncio
+async def test_presence_updates_are_per_connection(client) -> None:
+    """Test presence updates from different connections do not clobber each other."""
+    session_id = "presence-fields"
+
+    await ShareDBService.update_presence(
+        "code", session_id, "conn1", cursor={"line": 1, "column": 0}
+    )
+    await ShareDBService.update_presence(
+        "code", session_id, "conn2", cursor={"line": 2, "column": 4}
+    )
+    await ShareDBService.update_presence(
+        "code", session_id, "conn1", cursor={"line": 3, "column": 1}
+    )
+
+    presence = await ShareDBService.get_presence("code", session_id)
+    assert set(presence) == {"conn1", "conn2"}
+    assert presence["conn1"]["cursor"] == {"line": 3, "column": 1}
+    assert presence["conn2"]["cursor"] == {"line": 2, "column": 4}
+
+
+@pytest.mark.asyncio
+async def test_cursor_updates_coalesce_per_tick(client, monkeypatch) -> None:
+    """Test rapid cursor moves collapse into one broadcast of the latest position."""
+    sent: list[dict[str, Any]] = []
+    monkeypatch.setattr(
+        ShareDBHandler,
+        "_fan_out",
+        staticmethod(lambda targets, message: sent.append(message)),
+    )
+    await ShareDBService.subscribe("code", "cursor-coalesce", "conn1")
+    await ShareDBService.subscribe("code", "cursor-coalesce", "conn2")
+
+    for line in range(5):
+        response = await ShareDBHandler.handle_cursor_update(
+            {
+                "collection": "code",
+                "doc_id": "cursor-coalesce",
+                "cursor": {"line": line, "column": 0},
+            },
+            "conn1",
+            "cursor-coalesce",
+        )
+        assert response["type"] == "cursor-ack"
+    assert sent == []
+
+    await asyncio.sleep(_cursor_coalescer.interval * 3)
+    assert [message["cursor"]["line"] for message in sent] == [4]
+
+
+@pytest.mark.asyncio
+async def test_cursor_presence_is_written_once_per_tick(client) -> None:
+    """Test rapid cursor moves from several users record only the latest positions."""
+    session_id = "cursor-presence"
+    for user in range(3):
+        for line in range(5):
+            await ShareDBHandler.handle_cursor_update(
+                {
+                    "collection": "code",
+                    "doc_id": session_id,
+                    "cursor": {"line": line, "column": user},
+                },
+                f"conn{user}",
+                session_id,
+            )
+    assert await ShareDBService.get_presence("code", session_id) == {}
+
+    await asyncio.sleep(_cursor_coalescer.interval * 3)
+    presence = await ShareDBService.get_presence("code", session_id)
+    assert {
+        connection_id: entry["cursor"] for connection_id, entry in presence.items()
+    } == {f"conn{user}": {"line": 4, "column": user} for user in range(3)}
+
+
+@pytest.mark.asyncio
+async def test_solo_editor_skips_fan_out(client, monkeypatch) -> None:
+    """Test ops and cursor moves with no other subscriber broadcast nothing."""
+    session_id = "solo-editor"
+    sent: list[dict[str, Any]] = []
+    monkeypatch.setattr(
+        ShareDBHandler,
+        "_fan_out",
+        staticmethod(lambda targets, message: sent.append(message)),
+    )
+    await ShareDBService.create_document("code", session_id, "")
+    await ShareDBService.subscribe("code", session_id, "conn1")
+
+    response = await ShareDBHandler.handle_operation(
+        {
+            "collection": "code",
+            "doc_id": session_id,
+            "operation": {"type": "insert", "position": 0, "content": "x"},
+        },
+        "conn1",
+    )
+    assert response["type"] == "op-ack"
+    await ShareDBHandler.handle_cursor_update(
+        {"collection": "code", "doc_id": session_id, "cursor": {"line": 0}},
+        "conn1",
+        session_id,
+    )
+
+    await asyncio.sleep(_cursor_coalescer.interval * 3)
+    assert sent == []
+
+
+@pytest.mark.asyncio
+async def test_malformed_operation_is_rejected(client) -> None:
+    """Test operations with a bad type or position never reach the document."""
+    session_id = "malformed-op"
+    await ShareDBService.create_document("code", session_id, "abc")
+
+    for operation in (
+        {"type": "replace", "position": 0, "content": "x"},
+        {"type": "insert", "position": "0", "content": "x"},
+        {"type": "insert", "position": -1, "content": "x"},
+        "insert x at 0",
+    ):
+        response = await ShareDBHandler.handle_sharedb_message(
+            {
+                "type": "op",
+                "collection": "code",
+                "doc_id": session_id,
+                "operation": operation,
+            },
+            "conn1",
+            session_id,
+        )
+        assert response["type"] == "op-error"
+
+    doc = await ShareDBService.get_document("code", session_id)
+    assert doc.content == "abc"
+    assert doc.version == 0
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
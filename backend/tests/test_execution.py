@@ -1,6 +1,25 @@
 from __future__ import annotations
 
+import asyncio
+import os
+from uuid import uuid4
+
 import pytest
+import pytest_asyncio
+
+from app.services.executor.base import ExecutionRequest
+from app.services.executor.python_executor import (
+    _VALIDATION_CACHE,
+    Python313Executor,
+    _validate_source,
+)
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_warm_interpreters():
+    # Pre-started interpreters are bound to the per-test event loop.
+    yield
+    await Python313Executor.close_pool()
 
 
 @pytest.mark.asyncio
@@ -23,6 +42,109 @@ async def test_execute_python_code(client):
     assert data["session_id"] == session_id
 
 
+@pytest.mark.asyncio
+async def test_execute_python_reads_stdin_and_reports_errors(client):
+    create_response = await client.post(
+        "/api/v1/sessions",
+        json={"name": "ExecStdin", "language": "python3.13"},
+    )
+    session_id = create_response.json()["id"]
+
+    echo_response = await client.post(
+        f"/api/v1/sessions/{session_id}/execute",
+        json={
+            "code": "print(input()[::-1])",
+            "language": "python3.13",
+            "stdin": "abc\n",
+        },
+    )
+    assert echo_response.status_code == 200
+    assert echo_response.json()["stdout"] == "cba\n"
+
+    error_response = await client.post(
+        f"/api/v1/sessions/{session_id}/execute",
+        json={"code": "1 / 0", "language": "python3.13"},
+    )
+    data = error_response.json()
+    assert data["exit_code"] == 1
+    assert 'File "<string>", line 1' in data["stderr"]
+    assert "ZeroDivisionError" in data["stderr"]
+
+
+@pytest.mark.asyncio
+async def test_execute_python_enforces_memory_limit(client):
+    create_response = await client.post(
+        "/api/v1/sessions",
+        json={"name": "ExecMemory", "language": "python3.13"},
+    )
+    session_id = create_response.json()["id"]
+
+    small_response = await client.post(
+        f"/api/v1/sessions/{session_id}/execute",
+        json={"code": "print(1)", "language": "python3.13"},
+    )
+    assert small_response.json()["memory_used_kb"] > 0
+
+    large_response = await client.post(
+        f"/api/v1/sessions/{session_id}/execute",
+        json={
+            "code": "data = bytearray(256 * 1024 * 1024)",
+            "language": "python3.13",
+            "memory_limit": "128m",
+        },
+    )
+    data = large_response.json()
+    assert data["exit_code"] == 1
+    assert "MemoryError" in data["stderr"]
+
+
+@pytest.mark.asyncio
+async def test_execute_python_caps_requested_memory_at_the_default(client):
+    create_response = await client.post(
+        "/api/v1/sessions",
+        json={"name": "ExecMemoryCap", "language": "python3.13"},
+    )
+    session_id = create_response.json()["id"]
+
+    response = await client.post(
+        f"/api/v1/sessions/{session_id}/execute",
+        json={
+            "code": "data = bytearray(512 * 1024 * 1024)",
+            "language": "python3.13",
+            "memory_limit": "1000g",
+        },
+    )
+    data = response.json()
+    assert data["exit_code"] == 1
+    assert "MemoryError" in data["stderr"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_execution_reaps_the_worker(monkeypatch):
+    acquired = []
+    acquire = Python313Executor._pool.acquire
+
+    async def recording_acquire():
+        worker = await acquire()
+        acquired.append(worker)
+        return worker
+
+    monkeypatch.setattr(Python313Executor._pool, "acquire", recording_acquire)
+    request = ExecutionRequest(code="while True:\n    pass", timeout=30)
+    task = asyncio.create_task(Python313Executor().execute(request))
+    while not acquired:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    worker = acquired[0]
+    assert worker.process.returncode is not None
+    with pytest.raises(OSError):
+        os.fstat(worker.report_fd)
+
+
 @pytest.mark.asyncio
 async def test_execute_python_rejects_forbidden_import(client):
     create_response = await client.post(
@@ -40,6 +162,23 @@ async def test_execute_python_rejects_forbidden_import(client):
     assert "not allowed" in response.json()["detail"]
 
 
+@pytest.mark.asyncio
+async def test_execute_python_rejects_nested_dunder_import(client):
+    create_response = await client.post(
+        "/api/v1/sessions",
+        json={"name": "ExecDunder", "language": "python3.13"},
+    )
+    session_id = create_response.json()["id"]
+
+    payload = {"code": "print(len(__import__('os').sep))", "language": "python3.13"}
+    response = await client.post(
+        f"/api/v1/sessions/{session_id}/execute",
+        json=payload,
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "__import__ is not allowed"
+
+
 @pytest.mark.asyncio
 async def test_execute_rejects_invalid_language(client):
     create_response = await client.post(
@@ -56,6 +195,16 @@ async def test_execute_rejects_invalid_language(client):
     assert response.status_code == 422
 
 
+@pytest.mark.asyncio
+async def test_execute_unknown_session_returns_404(client):
+    payload = {"code": "print('hi')", "language": "python3.13"}
+    response = await client.post(
+        f"/api/v1/sessions/{uuid4()}/execute",
+        json=payload,
+    )
+    assert response.status_code == 404
+
+
 @pytest.mark.asyncio
 async def test_list_executors(client):
     response = await client.get("/api/v1/executors")
@@ -74,3 +223,10 @@ async def test_list_executors(client):
     )
     assert python_executor["display_name"] == "Python 3.13"
     assert "description" in python_executor
+
+
+def test_validation_cache_keys_on_a_digest_of_the_source():
+    code = "x = 1\n" + "# padding\n" * 10_000
+    assert _validate_source(code) == (True, None)
+    assert _validate_source(code) == (True, None)
+    assert all(len(key) == 16 for key in _VALIDATION_CACHE)
@@ -1,15 +1,18 @@
 import pytest
 
+# The health probes touch no database, so they use the shared client directly
+# and skip the per-test transaction that the ``client`` fixture sets up.
+
 
 @pytest.mark.asyncio
-async def test_health_endpoint(client):
-    response = await client.get("/health")
+async def test_health_endpoint(http_client):
+    response = await http_client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "healthy"}
 
 
 @pytest.mark.asyncio
-async def test_versioned_health_endpoint(client):
-    response = await client.get("/api/v1/health")
+async def test_versioned_health_endpoint(http_client):
+    response = await http_client.get("/api/v1/health")
     assert response.status_code == 200
     assert response.json() == {"status": "healthy"}
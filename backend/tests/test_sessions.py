@@ -4,11 +4,24 @@ from datetime import timedelta
 from uuid import UUID, uuid4
 
 import pytest
+import pytest_asyncio
+from sqlalchemy import select, update
 
-from app.models.session import Session, UserRole, _utcnow
+from app.models.session import Session, User, UserRole, _utcnow
 from app.services.session_service import cleanup_expired_sessions
 
 
+@pytest_asyncio.fixture()
+async def session_payload(client):
+    # Sessions are rolled back with each test, so this cannot outlive one.
+    response = await client.post(
+        "/api/v1/sessions",
+        json={"name": "Fixture", "language": "python3.13"},
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
 @pytest.mark.asyncio
 async def test_create_and_get_session(client):
     payload = {
@@ -36,7 +49,6 @@ async def test_create_and_get_session(client):
     assert fetched["users"][0]["role"] == UserRole.CREATOR.value
 
 
-@pytest.mark.skip(reason="Database transaction isolation issue in test environment")
 @pytest.mark.asyncio
 async def test_update_and_get_problem(client):
     create_response = await client.post(
@@ -52,17 +64,6 @@ async def test_update_and_get_problem(client):
         f"/api/v1/sessions/{session_id}/problem", json=new_problem
     )
 
-    # Debug info if the test fails
-    if update_response.status_code != 200:
-        print(f"Update failed with status: {update_response.status_code}")
-        print(f"Response body: {update_response.text}")
-        print(f"Session ID: {session_id}")
-        print(f"Creator ID: {creator_id}")
-
-        # Check the session details
-        session_response = await client.get(f"/api/v1/sessions/{session_id}")
-        print(f"Session details: {session_response.json()}")
-
     assert update_response.status_code == 200
     updated = update_response.json()
     assert updated["problem_text"] == new_problem["problem_text"]
@@ -73,22 +74,34 @@ async def test_update_and_get_problem(client):
 
 
 @pytest.mark.asyncio
-async def test_session_not_found_returns_404(client):
-    unknown_id = uuid4()
-    response = await client.get(f"/api/v1/sessions/{unknown_id}")
-    assert response.status_code == 404
-
-    update_response = await client.put(
-        f"/api/v1/sessions/{unknown_id}/problem",
-        json={"problem_text": "missing", "user_id": str(uuid4())},
+async def test_get_problem_returns_initial_text(client):
+    create_response = await client.post(
+        "/api/v1/sessions",
+        json={"name": "Trees", "language": "python3.13", "problem_text": "# BFS"},
     )
-    assert update_response.status_code == 404
+    session_id = create_response.json()["id"]
 
-    problem_response = await client.get(f"/api/v1/sessions/{unknown_id}/problem")
-    assert problem_response.status_code == 404
+    problem_response = await client.get(f"/api/v1/sessions/{session_id}/problem")
+    assert problem_response.status_code == 200
+    assert problem_response.json() == {"problem_text": "# BFS"}
 
-    join_response = await client.post(f"/api/v1/sessions/{unknown_id}/join", json={})
-    assert join_response.status_code == 404
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("method", "path_suffix", "body"),
+    [
+        ("GET", "", None),
+        ("PUT", "/problem", {"problem_text": "missing", "user_id": str(uuid4())}),
+        ("GET", "/problem", None),
+        ("POST", "/join", {}),
+    ],
+)
+async def test_session_not_found_returns_404(client, method, path_suffix, body):
+    unknown_id = uuid4()
+    response = await client.request(
+        method, f"/api/v1/sessions/{unknown_id}{path_suffix}", json=body
+    )
+    assert response.status_code == 404
 
 
 @pytest.mark.asyncio
@@ -116,12 +129,8 @@ async def test_list_sessions(client):
 
 
 @pytest.mark.asyncio
-async def test_join_session_create_and_rejoin(client):
-    create_response = await client.post(
-        "/api/v1/sessions",
-        json={"name": "Dynamic Programming", "language": "python3.13"},
-    )
-    session_id = create_response.json()["id"]
+async def test_join_session_create_and_rejoin(client, session_payload):
+    session_id = session_payload["id"]
 
     join_response = await client.post(
         f"/api/v1/sessions/{session_id}/join",
@@ -145,13 +154,8 @@ async def test_join_session_create_and_rejoin(client):
 
 
 @pytest.mark.asyncio
-async def test_delete_session(client):
-    create_response = await client.post(
-        "/api/v1/sessions",
-        json={"name": "ToRemove", "language": "python3.13"},
-    )
-    assert create_response.status_code == 201
-    session_id = create_response.json()["id"]
+async def test_delete_session(client, session_payload):
+    session_id = session_payload["id"]
 
     delete_response = await client.delete(f"/api/v1/sessions/{session_id}")
     assert delete_response.status_code == 204
@@ -173,13 +177,8 @@ async def test_create_session_rejects_unsupported_language(client):
 
 
 @pytest.mark.asyncio
-async def test_update_problem_requires_creator(client):
-    create_response = await client.post(
-        "/api/v1/sessions",
-        json={"name": "Permissions", "language": "python3.13"},
-    )
-    session_data = create_response.json()
-    session_id = session_data["id"]
+async def test_update_problem_requires_creator(client, session_payload):
+    session_id = session_payload["id"]
 
     join_response = await client.post(
         f"/api/v1/sessions/{session_id}/join",
@@ -203,11 +202,16 @@ async def test_cleanup_expired_sessions(client, db_session):
     session_data = create_response.json()
     session_id = UUID(session_data["id"])
 
-    db_obj = await db_session.get(Session, session_id)
-    assert db_obj is not None
-    db_obj.expires_at = _utcnow() - timedelta(hours=2)
+    expire = await db_session.execute(
+        update(Session)
+        .where(Session.id == session_id)
+        .values(expires_at=_utcnow() - timedelta(hours=2))
+    )
+    assert expire.rowcount == 1
     await db_session.commit()
 
     removed = await cleanup_expired_sessions(db_session)
     assert removed == 1
     assert await db_session.get(Session, session_id) is None
+    users = await db_session.execute(select(User).where(User.session_id == session_id))
+    assert users.scalars().all() == []
@@ -1,33 +1,197 @@
 from __future__ import annotations
 
+import asyncio
+
+import orjson
+import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.websocket.connection_manager import _OutboundQueue, connection_manager
+
+
+@pytest.fixture(scope="module")
+def sync_client():
+    # One app lifespan (Redis, background loops) serves every test in the module.
+    with TestClient(app) as sync_client:
+        yield sync_client
 
 
 def _drain_until_type(ws, expected_type):
     while True:
-        message = ws.receive_json()
-        if message.get("type") == expected_type:
-            return message
+        message = orjson.loads(ws.receive_text())
+        # Queued ShareDB frames may arrive merged into one batch frame.
+        batch = message["messages"] if message.get("type") == "batch" else [message]
+        for item in batch:
+            if item.get("type") == expected_type:
+                return item
 
 
-def test_websocket_broadcasts_cursor_moves():
-    with TestClient(app) as sync_client:
-        create_response = sync_client.post(
-            "/api/v1/sessions",
-            json={"name": "WS", "language": "python3.13"},
+def test_websocket_broadcasts_cursor_moves(sync_client):
+    create_response = sync_client.post(
+        "/api/v1/sessions",
+        json={"name": "WS", "language": "python3.13"},
+    )
+    session_id = create_response.json()["id"]
+
+    with (
+        sync_client.websocket_connect(f"/ws/sessions/{session_id}") as ws1,
+        sync_client.websocket_connect(f"/ws/sessions/{session_id}") as ws2,
+    ):
+        # Drain initial join notifications
+        join_notice = orjson.loads(ws1.receive_text())
+        assert join_notice["type"] == "user_join"
+
+        ws1.send_json({"type": "cursor_move", "data": {"line": 1}})
+        message = _drain_until_type(ws2, "cursor_move")
+        assert message["data"]["line"] == 1
+
+
+def test_websocket_routes_sharedb_fetch(sync_client):
+    create_response = sync_client.post(
+        "/api/v1/sessions",
+        json={"name": "WS Fetch", "language": "python3.13"},
+    )
+    session_id = create_response.json()["id"]
+
+    with sync_client.websocket_connect(f"/ws/sessions/{session_id}") as ws:
+        ws.send_json({"type": "fetch", "collection": "code", "doc_id": session_id})
+        message = _drain_until_type(ws, "fetch-response")
+        assert message["doc_id"] == session_id
+        assert message["version"] == 0
+
+
+def test_websocket_fans_out_sharedb_ops_to_subscribers(sync_client):
+    create_response = sync_client.post(
+        "/api/v1/sessions",
+        json={"name": "WS Ops", "language": "python3.13"},
+    )
+    session_id = create_response.json()["id"]
+    doc = {"collection": "code", "doc_id": session_id}
+
+    with (
+        sync_client.websocket_connect(f"/ws/sessions/{session_id}") as ws1,
+        sync_client.websocket_connect(f"/ws/sessions/{session_id}") as ws2,
+    ):
+        for ws in (ws1, ws2):
+            ws.send_json({"type": "subscribe", **doc})
+            _drain_until_type(ws, "subscribed")
+
+        ws1.send_json(
+            {
+                "type": "op",
+                **doc,
+                "operation": {"type": "insert", "position": 0, "content": "x"},
+            }
         )
-        session_id = create_response.json()["id"]
-
-        with (
-            sync_client.websocket_connect(f"/ws/sessions/{session_id}") as ws1,
-            sync_client.websocket_connect(f"/ws/sessions/{session_id}") as ws2,
-        ):
-            # Drain initial join notifications
-            join_notice = ws1.receive_json()
-            assert join_notice["type"] == "user_join"
-
-            ws1.send_json({"type": "cursor_move", "data": {"line": 1}})
-            message = _drain_until_type(ws2, "cursor_move")
-            assert message["data"]["line"] == 1
+        ack = _drain_until_type(ws1, "op-ack")
+        assert ack["version"] == 1
+
+        remote = _drain_until_type(ws2, "remote-op")
+        assert remote["operation"]["content"] == "x"
+
+
+def test_websocket_fetch_subscribes_in_the_same_round_trip(sync_client):
+    create_response = sync_client.post(
+        "/api/v1/sessions",
+        json={"name": "WS Fetch Subscribe", "language": "python3.13"},
+    )
+    session_id = create_response.json()["id"]
+    doc = {"collection": "code", "doc_id": session_id}
+
+    with (
+        sync_client.websocket_connect(f"/ws/sessions/{session_id}") as ws1,
+        sync_client.websocket_connect(f"/ws/sessions/{session_id}") as ws2,
+    ):
+        ws1.send_json({"type": "fetch", **doc, "subscribe": True})
+        snapshot = _drain_until_type(ws1, "fetch-response")
+        assert snapshot["subscribed"] is True
+
+        ws2.send_json(
+            {
+                "type": "op",
+                **doc,
+                "operation": {
+                    "type": "insert",
+                    "position": 0,
+                    "content": "x",
+                    "version": snapshot["version"],
+                },
+            }
+        )
+        remote = _drain_until_type(ws1, "remote-op")
+        assert remote["operation"]["version"] == snapshot["version"] + 1
+
+
+def test_websocket_replies_share_the_outbound_queue(sync_client, monkeypatch):
+    queued = []
+    enqueue_text = connection_manager.enqueue_text
+
+    def recording_enqueue(connection_id, text):
+        queued.append(orjson.loads(text)["type"])
+        return enqueue_text(connection_id, text)
+
+    monkeypatch.setattr(connection_manager, "enqueue_text", recording_enqueue)
+    create_response = sync_client.post(
+        "/api/v1/sessions",
+        json={"name": "WS Reply Order", "language": "python3.13"},
+    )
+    session_id = create_response.json()["id"]
+
+    with sync_client.websocket_connect(f"/ws/sessions/{session_id}") as ws:
+        ws.send_json({"type": "fetch", "collection": "code", "doc_id": session_id})
+        _drain_until_type(ws, "fetch-response")
+
+    assert queued == ["fetch-response"]
+
+
+def test_outbound_queue_merges_pending_frames_into_batch():
+    class RecordingSocket:
+        def __init__(self):
+            self.frames = []
+
+        async def send_text(self, text):
+            self.frames.append(text)
+
+    async def scenario():
+        socket = RecordingSocket()
+        queue = _OutboundQueue(socket, maxsize=10)
+        queue.put('{"type":"a"}')
+        queue.put('{"type":"b"}')
+        await asyncio.sleep(0)
+        queue.put('{"type":"c"}')
+        await asyncio.sleep(0)
+        return socket.frames
+
+    frames = [orjson.loads(frame) for frame in asyncio.run(scenario())]
+    assert frames == [
+        {"type": "batch", "messages": [{"type": "a"}, {"type": "b"}]},
+        {"type": "c"},
+    ]
+
+
+def test_outbound_queue_keeps_the_slow_consumer_close_task():
+    class StalledSocket:
+        def __init__(self):
+            self.closed_with = None
+
+        async def send_text(self, text):
+            await asyncio.Event().wait()
+
+        async def close(self, code):
+            self.closed_with = code
+
+    async def scenario():
+        socket = StalledSocket()
+        queue = _OutboundQueue(socket, maxsize=1)
+        queue.put('{"type":"a"}')
+        await asyncio.sleep(0)
+        queue.put('{"type":"b"}')
+        assert not queue.put('{"type":"c"}')
+        # Let the cancelled drainer unwind before checking the close task.
+        await asyncio.sleep(0)
+        assert queue._closer is not None
+        await queue._closer
+        return socket.closed_with
+
+    assert asyncio.run(scenario()) is not None
@@ -52,12 +52,14 @@ export const useShareDB = (
           type: 'fetch',
           collection,
           doc_id,
+          // Subscribe in the same round-trip as the fetch
+          subscribe: autoSubscribe && !hasSubscribed.current,
         })
       );
     } catch (err) {
       setError(`Failed to fetch document: ${err instanceof Error ? err.message : String(err)}`);
     }
-  }, [websocket, collection, doc_id]);
+  }, [websocket, collection, doc_id, autoSubscribe]);
 
   // Subscribe to document updates
   const subscribe = useCallback(async () => {
@@ -168,78 +170,85 @@ export const useShareDB = (
 
     const handleMessage = (event: MessageEvent) => {
       try {
-        const message = JSON.parse(event.data);
-
-        if (message.type === 'fetch-response') {
-          if (message.collection === collection && message.doc_id === doc_id) {
-            setContent(message.content);
-            setVersion(message.version);
-            lastKnownVersion.current = message.version;
-            setIsLoading(false);
-            setError(null);
-
-            // Auto-subscribe after fetch if enabled
-            if (autoSubscribe && !hasSubscribed.current) {
-              subscribe();
+        const parsed = JSON.parse(event.data);
+        // The server may merge several queued frames into one batch frame
+        const messages = parsed.type === 'batch' ? parsed.messages : [parsed];
+
+        for (const message of messages) {
+          if (message.type === 'fetch-response') {
+            if (message.collection === collection && message.doc_id === doc_id) {
+              setContent(message.content);
+              setVersion(message.version);
+              lastKnownVersion.current = message.version;
+              setIsLoading(false);
+              setError(null);
+
+              if (message.subscribed) {
+                hasSubscribed.current = true;
+                setIsSubscribed(true);
+              } else if (autoSubscribe && !hasSubscribed.current) {
+                // Auto-subscribe after fetch if enabled
+                subscribe();
+              }
             }
-          }
-        } else if (message.type === 'fetch-error') {
-          setError(message.error);
-          setIsLoading(false);
-        } else if (message.type === 'subscribed') {
-          if (message.collection === collection && message.doc_id === doc_id) {
-            setIsSubscribed(true);
-          }
-        } else if (message.type === 'remote-op') {
-          if (message.collection === collection && message.doc_id === doc_id) {
-            const operation = message.operation;
-
-            // Apply remote operation to local content
-            if (operation.type === 'insert' && operation.content !== undefined) {
-              setContent((prevContent) => {
-                const newContent =
-                  prevContent.slice(0, operation.position) +
-                  operation.content +
-                  prevContent.slice(operation.position);
-
-                onRemoteChange?.(newContent);
-                return newContent;
-              });
-            } else if (operation.type === 'delete') {
-              setContent((prevContent) => {
-                const length = operation.content ? operation.content.length : 1;
-                const newContent =
-                  prevContent.slice(0, operation.position) +
-                  prevContent.slice(operation.position + length);
-
-                onRemoteChange?.(newContent);
-                return newContent;
-              });
+          } else if (message.type === 'fetch-error') {
+            setError(message.error);
+            setIsLoading(false);
+          } else if (message.type === 'subscribed') {
+            if (message.collection === collection && message.doc_id === doc_id) {
+              setIsSubscribed(true);
             }
+          } else if (message.type === 'remote-op') {
+            if (message.collection === collection && message.doc_id === doc_id) {
+              const operation = message.operation;
+
+              // Apply remote operation to local content
+              if (operation.type === 'insert' && operation.content !== undefined) {
+                setContent((prevContent) => {
+                  const newContent =
+                    prevContent.slice(0, operation.position) +
+                    operation.content +
+                    prevContent.slice(operation.position);
+
+                  onRemoteChange?.(newContent);
+                  return newContent;
+                });
+              } else if (operation.type === 'delete') {
+                setContent((prevContent) => {
+                  const length = operation.content ? operation.content.length : 1;
+                  const newContent =
+                    prevContent.slice(0, operation.position) +
+                    prevContent.slice(operation.position + length);
+
+                  onRemoteChange?.(newContent);
+                  return newContent;
+                });
+              }
 
-            // Update version
-            setVersion(operation.version);
-            lastKnownVersion.current = operation.version;
-            onVersionChange?.(operation.version);
-          }
-        } else if (message.type === 'op-ack') {
-          if (message.collection === collection && message.doc_id === doc_id) {
-            setVersion(message.version);
-            lastKnownVersion.current = message.version;
-            onVersionChange?.(message.version);
-
-            // Send any pending changes
-            if (pendingChanges.current.length > 0) {
-              const pending = pendingChanges.current.shift();
-              if (pending) {
-                sendOperation(pending.type as 'insert' | 'delete', pending.position, pending.content);
+              // Update version
+              setVersion(operation.version);
+              lastKnownVersion.current = operation.version;
+              onVersionChange?.(operation.version);
+            }
+          } else if (message.type === 'op-ack') {
+            if (message.collection === collection && message.doc_id === doc_id) {
+              setVersion(message.version);
+              lastKnownVersion.current = message.version;
+              onVersionChange?.(message.version);
+
+              // Send any pending changes
+              if (pendingChanges.current.length > 0) {
+                const pending = pendingChanges.current.shift();
+                if (pending) {
+                  sendOperation(pending.type as 'insert' | 'delete', pending.position, pending.content);
+                }
               }
             }
-          }
-        } else if (message.type === 'history-response') {
-          if (message.collection === collection && message.doc_id === doc_id) {
-            // Handle operation history
-            console.log('Received operation history:', message.operations);
+          } else if (message.type === 'history-response') {
+            if (message.collection === collection && message.doc_id === doc_id) {
+              // Handle operation history
+              console.log('Received operation history:', message.operations);
+            }
           }
         }
       } catch (err) {
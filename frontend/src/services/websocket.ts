@@ -33,8 +33,11 @@ export class WebSocketService {
 
         this.ws.onmessage = (event) => {
           try {
-            const message: WebSocketMessage = JSON.parse(event.data);
-            this.handleMessage(message);
+            const message = JSON.parse(event.data);
+            // The server may merge several queued frames into one batch frame
+            const messages: WebSocketMessage[] =
+              message.type === 'batch' ? message.messages : [message];
+            messages.forEach((item) => this.handleMessage(item));
           } catch (error) {
             console.error('Failed to parse WebSocket message:', error);
           }